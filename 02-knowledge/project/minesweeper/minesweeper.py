@@ -1,11 +1,65 @@
 import random
 import logging
+import logging.handlers
+from collections import deque
+
+from probability import mine_probabilities
 
 FORMAT = '%(asctime)s %(name)-12s %(levelname)-8s %(message)s'
-logging.basicConfig(
-    filename='history.log', format=FORMAT, level=logging.INFO)
+
+
+class FreezeMessage(logging.Filter):
+    """
+    Renders a record's message right away. Buffered records are only
+    written later, and their arguments (sets of cells, sentences) may
+    have changed by then.
+    """
+
+    def filter(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return True
+
+def configure_logging(sink='file', filename='history.log', capacity=1000):
+    """
+    Configures where the game and AI reasoning is logged to.
+
+    `sink` may be:
+        - 'file': every record is written to `filename` as it happens
+        - 'buffer': records are held in memory and written to `filename`
+          `capacity` at a time
+        - 'off': records are dropped
+
+    Only the 'minesweeper' logger (and its children, such as the runner's)
+    is configured: the root logger of the program is left alone.
+    """
+    if sink not in ('file', 'buffer', 'off'):
+        raise ValueError(f"Unknown logging sink: {sink}")
+
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+
+    if sink == 'off':
+        logger.setLevel(logging.WARNING)
+        return
+
+    # delay opening the file until something is actually logged
+    handler = logging.FileHandler(filename, delay=True)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    if sink == 'buffer':
+        handler = logging.handlers.MemoryHandler(
+            capacity, flushLevel=logging.ERROR, target=handler)
+        handler.addFilter(FreezeMessage())
+
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
 
 logger = logging.getLogger('minesweeper')
+configure_logging()
+
 class Minesweeper():
     """
     Minesweeper game representation
@@ -88,6 +142,8 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+# Not used by the AI, which uses BitSentence: kept as the reference API
+# described in the README (and by the original project's specification)
 class Sentence():
     """
     Logical statement about a Minesweeper game
@@ -169,17 +225,123 @@ class Sentence():
         self.cells.discard(cell)
 
 
+class BitSentence():
+    """
+    Logical statement about a Minesweeper game, like Sentence, with its
+    cells packed into the bits of an integer: cell (i, j) is bit i * width + j.
+
+    Subset tests, differences and equality are then single integer
+    operations. A BitSentence is immutable and hashable, so that a
+    knowledge base can be a set of sentences.
+    """
+
+    __slots__ = ("mask", "count", "width")
+
+    def __init__(self, mask, count, width):
+        self.mask = mask
+        self.count = count
+        self.width = width
+
+    @classmethod
+    def from_cells(cls, cells, count, width):
+        mask = 0
+        for i, j in cells:
+            mask |= 1 << (i * width + j)
+        return cls(mask, count, width)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitSentence):
+            return NotImplemented
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __len__(self):
+        return bin(self.mask).count("1")
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def __sub__(self, other):
+        """
+        Returns the sentence about the cells of self which are not in other.
+        Only meaningful if other is a subset of self.
+        """
+        return BitSentence(
+            self.mask & ~other.mask, self.count - other.count, self.width)
+
+    @property
+    def cells(self):
+        """
+        Returns the set of (i, j) cells of the sentence.
+        """
+        return {divmod(index, self.width) for index in self.indexes()}
+
+    def indexes(self):
+        """
+        Yields the bit index of every cell of the sentence.
+        """
+        mask = self.mask
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def issubset(self, other):
+        return not self.mask & ~other.mask
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in self.cells known to be mines.
+        """
+        if len(self) == self.count:
+            return self.cells
+        return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in self.cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+        return set()
+
+    def mark_mine(self, cell):
+        """
+        Returns the sentence updated with the fact that
+        a cell is known to be a mine.
+        """
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if not self.mask & bit:
+            return self
+        return BitSentence(self.mask ^ bit, self.count - 1, self.width)
+
+    def mark_safe(self, cell):
+        """
+        Returns the sentence updated with the fact that
+        a cell is known to be safe.
+        """
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if not self.mask & bit:
+            return self
+        return BitSentence(self.mask ^ bit, self.count, self.width)
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, total_mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Number of mines on the board, if known
+        self.total_mines = total_mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -187,8 +349,23 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true,
+        # as BitSentences, so that duplicates are discarded for free
+        self.knowledge_base = set()
+
+        # Index from each cell (as a bit index) to the sentences mentioning it,
+        # so that only sentences touching a changed cell are revisited
+        self.cell_sentences = {}
+
+        # Sentences that changed and must be re-examined
+        self.worklist = deque()
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return list(self.knowledge_base)
 
     def mark_mine(self, cell):
         """
@@ -196,8 +373,12 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+
+        # only the sentences mentioning this cell need to be updated
+        index = cell[0] * self.width + cell[1]
+        for sentence in self.cell_sentences.pop(index, ()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
@@ -208,8 +389,90 @@ class MinesweeperAI():
         self.safes.add(cell)
 
         # update knowledge to express that the cell is safe as well
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        index = cell[0] * self.width + cell[1]
+        for sentence in self.cell_sentences.pop(index, ()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_safe(cell))
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, indexing it by its cells
+        and queueing it for propagation.
+
+        Returns False if the sentence is empty or already known.
+        """
+        if not sentence.mask or sentence in self.knowledge_base:
+            return False
+
+        self.knowledge_base.add(sentence)
+        for index in sentence.indexes():
+            self.cell_sentences.setdefault(index, set()).add(sentence)
+        self.worklist.append(sentence)
+
+        return True
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base.
+        """
+        self.knowledge_base.discard(sentence)
+        for index in sentence.indexes():
+            if index in self.cell_sentences:
+                self.cell_sentences[index].discard(sentence)
+
+    def subtract(self, sentence, subset):
+        """
+        Replaces a sentence by its difference with a sentence whose cells
+        are a subset of its own.
+
+        For instance, if I have {A, B, C} = 2 and {A, B} = 1, then
+        {A, B, C} = 2 may be replaced by {C} = 1.
+        """
+        self.remove_sentence(sentence)
+        inferred = sentence - subset
+        if self.add_sentence(inferred):
+            logger.info('Inferred knowledge: %s', inferred)
+
+    def propagate(self):
+        """
+        Examines queued sentences until no more safes, mines or
+        subset inferences can be drawn (a fixpoint).
+        """
+        while self.worklist:
+            sentence = self.worklist.popleft()
+            if sentence not in self.knowledge_base:
+                continue
+
+            # mark safes and mines: the sentence empties itself and is dropped
+            known_safes = sentence.known_safes()
+            if known_safes:
+                logger.info('Marking %s as safes', known_safes)
+                for cell in known_safes:
+                    self.mark_safe(cell)
+                continue
+
+            known_mines = sentence.known_mines()
+            if known_mines:
+                logger.info('Marking %s as mines', known_mines)
+                for cell in known_mines:
+                    self.mark_mine(cell)
+                continue
+
+            # only sentences sharing a cell can be a subset or superset
+            related = set()
+            for index in sentence.indexes():
+                related |= self.cell_sentences[index]
+            related.discard(sentence)
+
+            for other in related:
+                if other not in self.knowledge_base:
+                    continue
+                if other.issubset(sentence):
+                    # the sentence itself changed, it was queued again
+                    self.subtract(sentence, other)
+                    break
+                if sentence.issubset(other):
+                    self.subtract(other, sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -228,10 +491,10 @@ class MinesweeperAI():
         """
         # step 1: mark as a move made
         self.moves_made.add(cell)
-        
+
         # step 2: mark the cell as safe
         self.mark_safe(cell)
-        
+
         # step 3: add the sentence regarding the new information coming from the click
         nearbies = set()
         # run through nearby elements
@@ -242,65 +505,22 @@ class MinesweeperAI():
                 if (i, j) == cell:
                     continue
                 # if cell within bounds
-                if 0 <= i < self.height and 0 <= j < self.width:               
-                    nearbies.add((i,j))
-        
-        # nearbies are the knowledge, remove self.safes to account the fact that they are not mines
-        sentence = Sentence(nearbies - self.safes, count)
-        
-        # include only if new knowledge.
-        if sentence not in self.knowledge:
-            self.knowledge.append(sentence)
-            logger.info(f'Knowledge included: {sentence}')
-        
-
-        # step 5
-        new_cells = set()
-        knowledge = []
-        for sentence_a in self.knowledge:
-            for sentence_b in self.knowledge:
-                if sentence_a != sentence_b:
-                    
-                    if sentence_a.cells.issubset(sentence_b.cells):
-                        new_cells = sentence_b.cells - sentence_a.cells
-                        new_count = sentence_b.count - sentence_a.count
-                    elif sentence_b.cells.issubset(sentence_a.cells):
-                        new_cells = sentence_a.cells - sentence_b.cells 
-                        new_count = sentence_a.count - sentence_b.count
-                    if new_cells:
-                        new_sentence = Sentence(new_cells, new_count)
-                        if new_sentence not in self.knowledge and new_sentence not in knowledge:
-                            knowledge.append(new_sentence)
-
-        for k in knowledge:
-            logger.info(f'Inferred knowledge: {k}')
-
-        if len(knowledge):
-            self.knowledge += knowledge
-
-        # clean up knowledge to discard equal values
-        self.knowledge = self.get_distinct_sentences()
-
-        # step 4: mark safes and mines from knowledge
-        for sentence in self.knowledge:
-            known_safes = sentence.known_safes().copy()
-            known_mines = sentence.known_mines().copy()
-            if known_safes:
-                logger.info(f'Marking {known_safes} as safes')
-                for cell in known_safes:
-                    self.mark_safe(cell)
-            if known_mines:
-                logger.info(f'Marking {known_mines} as mines')
-                for cell in known_mines:
-                    self.mark_mine(cell)
+                if 0 <= i < self.height and 0 <= j < self.width:
+                    # known safes are not mines, known mines are discounted
+                    if (i, j) in self.safes:
+                        continue
+                    if (i, j) in self.mines:
+                        count -= 1
+                        continue
+                    nearbies.add((i, j))
 
-    def get_distinct_sentences(self):
-        unique_sentences = []
-        for s in self.knowledge:
-            if s not in unique_sentences:
-                unique_sentences.append(s)
+        # include only if new knowledge.
+        sentence = BitSentence.from_cells(nearbies, count, self.width)
+        if self.add_sentence(sentence):
+            logger.info('Knowledge included: %s', sentence)
 
-        return unique_sentences
+        # steps 4 and 5: propagate the changed sentences up to a fixpoint
+        self.propagate()
 
     def make_safe_move(self):
         """
@@ -314,8 +534,8 @@ class MinesweeperAI():
         # remove from set of safe moves, the moves already made.
         
         possible_safe_moves = self.safes - self.moves_made - self.mines
-        logger.info(f'Possible safe moves: {possible_safe_moves}')
-        logger.info(f'Mines known: {self.mines}')
+        logger.info('Possible safe moves: %s', possible_safe_moves)
+        logger.info('Mines known: %s', self.mines)
 
         # if empty, we will have to make a random move
         if not len(possible_safe_moves):
@@ -323,7 +543,7 @@ class MinesweeperAI():
 
         chosen = possible_safe_moves.pop()
 
-        logger.info(f'Chosen move: {chosen}')
+        logger.info('Chosen move: %s', chosen)
 
         return chosen
 
@@ -360,56 +580,59 @@ class MinesweeperAI():
         chosen = possible_moves.pop()
         
         
-        logger.info(f'Chosen move: {chosen}')
+        logger.info('Chosen move: %s', chosen)
         return chosen
 
+    def mine_probabilities(self):
+        """
+        Returns a dict mapping every cell not known to be safe or a mine
+        to its probability of being a mine, given the knowledge base
+        and the total number of mines on the board.
+        """
+        # consider MINES to be the square root of the board if not told
+        mines = self.total_mines
+        if mines is None:
+            mines = int((self.height * self.width) ** 0.5)
+
+        unknown = set()
+        for i in range(self.height):
+            for j in range(self.width):
+                unknown.add((i, j))
+        unknown -= self.moves_made | self.mines | self.safes
+
+        return mine_probabilities(
+            ((sentence.cells, sentence.count) for sentence in self.knowledge),
+            unknown,
+            max(mines - len(self.mines), 0)
+        )
+
     def make_educated_guess(self):
         """
         Returns a move to make on the Minesweeper board.
-        
-        This is similar to the random-move, however, it tries to use the probability
-        of having a mine within a set of cells into account.
+
+        This is similar to the random-move, however, it takes the probability
+        of each cell being a mine into account and picks the least likely one.
 
         The idea is: if you have two knowledges:
             - {(1,1), (2,2), (3,3)} = 1
             - {(4,4), (5,5)} = 1
 
-        The first knowledge also tells you that the probability of having a mine is 1 out of 3 (33%)
-        whereas the second knowledge is telling you that, if you pick one at random from it, you end 
-        up with 1 out of 2 (50%) probability of choosing a mine. Hence, the first option is a better 
-        guess.
-
+        The first knowledge tells you that, on its own, the probability of having
+        a mine is 1 out of 3 (33%) whereas the second one tells you 1 out of 2 (50%).
+        Overlapping knowledges and the total number of mines change those numbers,
+        so the probabilities are computed exactly by enumerating every mine
+        configuration consistent with the whole knowledge base, or estimated for
+        groups of cells too large to enumerate (see probability.py).
         """
-        # consider a random move as the ceiling
-        # consider MINES to be the square root of the board for now
-        MINES = int((self.height * self.width) ** 0.5) 
-        complete_board = (self.height * self.width)
-        explosion_probability = MINES / (complete_board - len(self.moves_made))
-        educated_guess = set()
+        probabilities = self.mine_probabilities()
 
-        logger.info(f'Random probability: {explosion_probability}')
-
-        for sentence in self.knowledge:
-            # i want to get the minimum value of explosion_probability
-            # exclude division by zero
-            if len(sentence.cells):
-                if sentence.count / len(sentence.cells) < explosion_probability:
-                    # number of mines / number of cells
-                    explosion_probability = sentence.count / len(sentence.cells)
-                    educated_guess = sentence.cells
-
-
-        # create the set of all possible moves:
-        possible_moves = educated_guess - self.moves_made - self.mines - self.safes 
-        
         # if no move was found, return None
-        if not len(possible_moves):
+        if not probabilities:
             return None
 
-        logger.info('AI making educated guess. You may be more confident ...')
-        logger.info(f'Educated Guess domain: {educated_guess}')
-        logger.info(f'Probability of exploding: {explosion_probability}')
+        chosen = min(probabilities, key=probabilities.get)
 
-        chosen = possible_moves.pop()        
-        logger.info(f'Chosen move: {chosen}')
+        logger.info('AI making educated guess. You may be more confident ...')
+        logger.info('Probability of exploding: %s', probabilities[chosen])
+        logger.info('Chosen move: %s', chosen)
         return chosen
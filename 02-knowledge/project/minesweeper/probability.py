@@ -0,0 +1,303 @@
+"""
+Exact mine probabilities for a Minesweeper knowledge base.
+
+The cells mentioned by the knowledge (the frontier) are split into
+independent components, i.e. groups of cells linked by shared sentences.
+Every component is solved on its own by enumerating the mine configurations
+that satisfy all of its sentences, and the results are combined with the
+number of ways the remaining mines may be spread over the cells no sentence
+talks about (the unconstrained cells).
+
+Enumeration is exponential in the size of a component, so it gives up after
+MAX_NODES assignments; such components get a local estimate instead of
+exact probabilities (see estimate_component).
+"""
+from collections import deque
+from functools import lru_cache
+from math import comb
+
+# Assignments tried while enumerating one component before falling back
+# to an estimate of its probabilities
+MAX_NODES = 20000
+
+# Rounds of rescaling done by estimate_component
+ESTIMATE_ROUNDS = 20
+
+
+class TooLarge(Exception):
+    """
+    Raised when enumerating a component exceeds MAX_NODES assignments.
+    """
+
+
+@lru_cache(maxsize=None)
+def combinations(n, k):
+    """
+    Returns the number of ways of choosing k mines among n cells.
+    """
+    if k < 0 or k > n:
+        return 0
+    return comb(n, k)
+
+
+def components(constraints):
+    """
+    Splits a list of (cells, count) constraints into independent groups,
+    that is, groups which do not share any cell.
+
+    Returns a list of frozensets of constraints.
+    """
+    # union-find over the cells of the frontier
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        cells = iter(cells)
+        first = next(cells)
+        parent.setdefault(first, first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            root_a, root_b = find(first), find(cell)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+    groups = {}
+    for constraint in constraints:
+        root = find(next(iter(constraint[0])))
+        groups.setdefault(root, set()).add(constraint)
+
+    return [frozenset(group) for group in groups.values()]
+
+
+@lru_cache(maxsize=4096)
+def solve_component(constraints):
+    """
+    Enumerates every mine configuration consistent with a component.
+
+    `constraints` is a frozenset of (frozenset of cells, count) tuples.
+    Components left untouched by a move are hashed to the same key,
+    so their solutions are reused across moves.
+
+    Returns a tuple of cells and a dict mapping the number of mines of a
+    configuration to a pair (number of configurations, list of how many of
+    those configurations have a mine in each cell).
+
+    Components needing more than MAX_NODES assignments are estimated
+    instead, see estimate_component.
+    """
+    constraints = list(constraints)
+
+    # order cells in breadth-first fashion so that sentences get fully
+    # assigned (and pruned) as early as possible
+    cell_constraints = {}
+    for n, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            cell_constraints.setdefault(cell, []).append(n)
+
+    cells = []
+    seen = set()
+    for start in sorted(cell_constraints):
+        if start in seen:
+            continue
+        seen.add(start)
+        frontier = deque([start])
+        while frontier:
+            cell = frontier.popleft()
+            cells.append(cell)
+            for n in cell_constraints[cell]:
+                for neighbor in sorted(constraints[n][0]):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        frontier.append(neighbor)
+
+    # per constraint: mines still needed and cells still unassigned
+    need = [count for _, count in constraints]
+    left = [len(cells) for cells, _ in constraints]
+    watched = [cell_constraints[cell] for cell in cells]
+    assignment = [0] * len(cells)
+    totals = {}
+    nodes = 0
+
+    def backtrack(index, mines):
+        nonlocal nodes
+        nodes += 1
+        if nodes > MAX_NODES:
+            raise TooLarge
+        if index == len(cells):
+            entry = totals.setdefault(mines, [0, [0] * len(cells)])
+            entry[0] += 1
+            counts = entry[1]
+            for i, value in enumerate(assignment):
+                counts[i] += value
+            return
+
+        for value in (0, 1):
+            consistent = True
+            for n in watched[index]:
+                need[n] -= value
+                left[n] -= 1
+                if need[n] < 0 or need[n] > left[n]:
+                    consistent = False
+            if consistent:
+                assignment[index] = value
+                backtrack(index + 1, mines + value)
+            for n in watched[index]:
+                need[n] += value
+                left[n] += 1
+        assignment[index] = 0
+
+    try:
+        backtrack(0, 0)
+    except TooLarge:
+        return estimate_component(constraints, cells)
+
+    return tuple(cells), {
+        mines: (solutions, counts)
+        for mines, (solutions, counts) in totals.items()
+    }
+
+
+def estimate_component(constraints, cells):
+    """
+    Estimates the probabilities of a component too large to enumerate.
+
+    Every cell starts at the average density (count / number of cells) of
+    its sentences, then the cells of each sentence are repeatedly rescaled
+    so that their probabilities add up to the sentence's count.
+
+    Returns the same shape as solve_component: the component is taken to
+    hold the rounded expected number of mines, in a single configuration
+    whose "counts" are the estimated probabilities.
+    """
+    estimates = {}
+    for sentence, count in constraints:
+        for cell in sentence:
+            estimates.setdefault(cell, []).append(count / len(sentence))
+    estimates = {
+        cell: sum(densities) / len(densities)
+        for cell, densities in estimates.items()
+    }
+
+    for _ in range(ESTIMATE_ROUNDS):
+        for sentence, count in constraints:
+            total = sum(estimates[cell] for cell in sentence)
+            if total:
+                for cell in sentence:
+                    estimates[cell] = min(estimates[cell] * count / total, 1)
+
+    probabilities = [estimates[cell] for cell in cells]
+    return tuple(cells), {round(sum(probabilities)): (1, probabilities)}
+
+
+def convolve(a, b):
+    """
+    Combines two distributions {mines: number of configurations}.
+    """
+    result = {}
+    for mines_a, weight_a in a.items():
+        for mines_b, weight_b in b.items():
+            mines = mines_a + mines_b
+            result[mines] = result.get(mines, 0) + weight_a * weight_b
+    return result
+
+
+def mine_probabilities(constraints, unknown, mines_left=None):
+    """
+    Returns a dict mapping each unknown cell to its exact probability of
+    being a mine, given that every configuration consistent with the
+    knowledge is equally likely.
+
+    `constraints` is an iterable of (cells, count) pairs, `unknown` the set
+    of cells not known to be safe or mines, and `mines_left` the number of
+    mines not yet identified. If `mines_left` is None (or inconsistent with
+    the knowledge), components are weighted independently and the
+    unconstrained cells are left out of the result.
+    """
+    constraints = [
+        (frozenset(cells), count) for cells, count in constraints if cells
+    ]
+    solved = [solve_component(group) for group in components(constraints)]
+
+    frontier = set()
+    for cells, _ in solved:
+        frontier.update(cells)
+    unconstrained = len(unknown - frontier)
+
+    probabilities = None
+    if mines_left is not None:
+        probabilities = combine(solved, unconstrained, mines_left)
+    if probabilities is None:
+        probabilities = combine(solved, 0, None) or {None: None}
+
+    rest = probabilities.pop(None)
+    if rest is not None:
+        for cell in unknown - frontier:
+            probabilities[cell] = rest
+
+    return probabilities
+
+
+def combine(solved, unconstrained, mines_left):
+    """
+    Combines the solved components into per-cell probabilities. The
+    probability of each unconstrained cell is stored under the None key.
+
+    Returns None if no configuration is consistent with `mines_left`.
+    """
+    def weight(mines):
+        # ways of placing the remaining mines among the unconstrained cells
+        if mines_left is None:
+            return 1
+        return combinations(unconstrained, mines_left - mines)
+
+    distributions = [
+        {mines: solutions for mines, (solutions, _) in totals.items()}
+        for _, totals in solved
+    ]
+
+    # prefix[i] combines components before i, suffix[i] those from i onwards
+    prefix = [{0: 1}]
+    for distribution in distributions:
+        prefix.append(convolve(prefix[-1], distribution))
+    suffix = [{0: 1}]
+    for distribution in reversed(distributions):
+        suffix.append(convolve(suffix[-1], distribution))
+    suffix.reverse()
+
+    total = sum(
+        solutions * weight(mines) for mines, solutions in prefix[-1].items()
+    )
+    if not total:
+        return None
+
+    probabilities = {}
+    for i, (cells, totals) in enumerate(solved):
+        others = convolve(prefix[i], suffix[i + 1])
+        numerators = [0] * len(cells)
+        for mines, (_, counts) in totals.items():
+            ways = sum(
+                solutions * weight(mines + other)
+                for other, solutions in others.items()
+            )
+            for n, count in enumerate(counts):
+                numerators[n] += count * ways
+        for cell, numerator in zip(cells, numerators):
+            probabilities[cell] = numerator / total
+
+    # every unconstrained cell is equally likely to hold one of the mines
+    # not placed in the frontier
+    if mines_left is not None and unconstrained:
+        numerator = sum(
+            solutions * combinations(unconstrained - 1, mines_left - mines - 1)
+            for mines, solutions in prefix[-1].items()
+        )
+        probabilities[None] = numerator / total
+    else:
+        probabilities[None] = None
+
+    return probabilities
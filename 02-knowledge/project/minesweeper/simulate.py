@@ -0,0 +1,122 @@
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper import Minesweeper, MinesweeperAI, configure_logging
+
+# Games are played with seeds SEED, SEED + 1, ..., so runs are reproducible
+SEED = 0
+
+# Games are short, so each process is sent them by the dozen rather than
+# one message per game
+CHUNKSIZE = 16
+
+PERCENTILES = [50, 90, 99]
+
+
+def main():
+    usage = "Usage: python simulate.py games height width mines [off|buffer|file]"
+    if len(sys.argv) not in [5, 6]:
+        sys.exit(usage)
+
+    games = int(sys.argv[1])
+    height, width, mines = int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+    sink = sys.argv[5] if len(sys.argv) == 6 else "off"
+    if sink not in ["off", "buffer", "file"]:
+        sys.exit(usage)
+
+    workers = os.cpu_count()
+    start = time.perf_counter()
+    results = simulate(games, height, width, mines, sink, workers)
+    elapsed = time.perf_counter() - start
+
+    report = summarize(results, elapsed)
+    print(f"Played {games} games of {height}x{width} with {mines} mines "
+          f"in {elapsed:.2f}s on {workers} processes")
+    print(f"  Win rate: {report['win_rate']:.2%}")
+    print(f"  Moves: {report['moves']} ({report['moves_per_second']:.0f} moves/s)")
+    for percentile in PERCENTILES:
+        print(f"  p{percentile} move latency: {report[f'p{percentile}'] * 1000:.3f}ms")
+    print(f"  max move latency: {report['max'] * 1000:.3f}ms")
+
+
+def simulate(games, height, width, mines, sink="off", workers=None):
+    """
+    Plays `games` seeded games in parallel over `workers` processes,
+    logging to `sink` (see configure_logging).
+
+    Returns a list of (won, latencies) tuples, one per game.
+    """
+    seeds = range(SEED, SEED + games)
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=configure_logging,
+            initargs=(sink,)) as executor:
+        return list(executor.map(
+            play, seeds,
+            [height] * games, [width] * games, [mines] * games,
+            chunksize=CHUNKSIZE
+        ))
+
+
+def play(seed, height, width, mines):
+    """
+    Plays a game headlessly, the way the AI Move button of runner.py does,
+    until the AI hits a mine or runs out of moves.
+
+    Returns whether the game was won and the time each move took, in seconds
+    (choosing the move and adding the resulting knowledge).
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, total_mines=mines)
+
+    latencies = []
+    won = False
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None:
+            # no moves left: the AI flags every mine it knows of
+            won = ai.mines == game.mines
+            break
+        if game.is_mine(move):
+            break
+        ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+
+    # records of a buffered sink would otherwise be lost with the worker
+    for handler in logging.getLogger('minesweeper').handlers:
+        handler.flush()
+
+    return won, latencies
+
+
+def summarize(results, elapsed):
+    """
+    Computes the win rate, move throughput over the `elapsed` wall-clock
+    seconds of the whole run, and move latency percentiles of a list of
+    (won, latencies) tuples.
+    """
+    latencies = sorted(
+        latency for _, game_latencies in results for latency in game_latencies
+    )
+    report = {
+        "win_rate": sum(won for won, _ in results) / len(results),
+        "moves": len(latencies),
+        "moves_per_second": len(latencies) / elapsed,
+        "max": latencies[-1] if latencies else 0
+    }
+    for percentile in PERCENTILES:
+        index = min(len(latencies) * percentile // 100, len(latencies) - 1)
+        report[f"p{percentile}"] = latencies[index] if latencies else 0
+    return report
+
+
+if __name__ == "__main__":
+    main()
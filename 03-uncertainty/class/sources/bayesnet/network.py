@@ -0,0 +1,197 @@
+import numpy as np
+
+
+class Node():
+    """
+    Random variable of a Bayesian network, with its probability table.
+
+    A node with no parents takes a dict mapping each value to its probability.
+    A node with parents takes a list of rows, one per combination of parent
+    values and value, with the probability last, e.g.
+
+        ["none", "yes", 0.4]  # P(maintenance = yes | rain = none) = 0.4
+
+    The table is stored as a NumPy array `cpt` with one axis per parent,
+    followed by one axis for the node's own value.
+    """
+
+    def __init__(self, name, distribution, parents=()):
+        self.name = name
+        self.parents = list(parents)
+
+        if not self.parents:
+            self.values = list(distribution)
+            self.cpt = np.array([distribution[value] for value in self.values])
+            return
+
+        self.values = []
+        for row in distribution:
+            if row[-2] not in self.values:
+                self.values.append(row[-2])
+
+        self.cpt = np.zeros(
+            [len(parent.values) for parent in self.parents] + [len(self.values)]
+        )
+        for *parent_values, value, p in distribution:
+            index = tuple(
+                parent.values.index(parent_value)
+                for parent, parent_value in zip(self.parents, parent_values)
+            )
+            self.cpt[index + (self.values.index(value),)] = p
+
+    def index(self, value):
+        return self.values.index(value)
+
+
+class BayesianNetwork():
+    """
+    Bayesian network over nodes given in topological order (parents first).
+    """
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.position = {node.name: i for i, node in enumerate(self.states)}
+
+    def probability(self, observations):
+        """
+        Returns the array of joint probabilities of a list of observations,
+        each a list of values in the order of `states`.
+        """
+        observations = [list(observation) for observation in observations]
+        indexes = {
+            node.name: np.array([
+                node.index(observation[i]) for observation in observations
+            ])
+            for i, node in enumerate(self.states)
+        }
+
+        probabilities = np.ones(len(observations))
+        for node in self.states:
+            index = tuple(indexes[parent.name] for parent in node.parents)
+            probabilities *= node.cpt[index + (indexes[node.name],)]
+        return probabilities
+
+    def factors(self, evidence):
+        """
+        Returns the factors of the network, as (variable positions, array)
+        pairs, with the axes of evidence variables fixed to their value.
+        """
+        factors = []
+        for node in self.states:
+            variables = [self.position[parent.name] for parent in node.parents]
+            variables.append(self.position[node.name])
+            table = node.cpt
+
+            # select the slice of the table matching the evidence
+            index = []
+            kept = []
+            for variable in variables:
+                name = self.states[variable].name
+                if name in evidence:
+                    index.append(self.states[variable].index(evidence[name]))
+                else:
+                    index.append(slice(None))
+                    kept.append(variable)
+            factors.append((kept, table[tuple(index)]))
+        return factors
+
+    def marginal(self, name, evidence):
+        """
+        Returns the distribution of node `name` given `evidence` (a dict
+        mapping node names to values), by variable elimination.
+        """
+        query = self.position[name]
+        factors = self.factors(evidence)
+
+        remaining = {
+            variable for variables, _ in factors for variable in variables
+        } - {query}
+        while remaining:
+            # eliminate the variable whose product involves the fewest others
+            def size(variable):
+                return len(set().union(*(
+                    variables for variables, _ in factors
+                    if variable in variables
+                )))
+            variable = min(sorted(remaining), key=size)
+            remaining.remove(variable)
+
+            involved = [factor for factor in factors if variable in factor[0]]
+            factors = [factor for factor in factors if variable not in factor[0]]
+            kept = sorted(
+                set().union(*(variables for variables, _ in involved)) - {variable}
+            )
+            factors.append((kept, multiply(involved, kept)))
+
+        distribution = multiply(factors, [query])
+        return distribution / distribution.sum()
+
+    def predict_proba(self, evidence):
+        """
+        Returns, in the order of `states`, the observed value of each
+        evidence node and the distribution (a dict mapping values to
+        probabilities) of every other node given the evidence.
+        """
+        predictions = []
+        for node in self.states:
+            if node.name in evidence:
+                predictions.append(evidence[node.name])
+            else:
+                distribution = self.marginal(node.name, evidence)
+                predictions.append(dict(zip(node.values, distribution.tolist())))
+        return predictions
+
+    def likelihood_weighting(self, name, evidence, n, batch_size=1000000,
+                             seed=None):
+        """
+        Estimates the distribution of node `name` given `evidence` from `n`
+        samples. Evidence nodes are fixed to their value and each sample is
+        weighted by the probability of the evidence given its parents, so no
+        sample is discarded. Samples are drawn `batch_size` at a time, as
+        arrays, with every node sampled for the whole batch at once.
+
+        Returns a dict mapping each value of the node to its probability.
+        """
+        rng = np.random.default_rng(seed)
+        node = self.states[self.position[name]]
+        totals = np.zeros(len(node.values))
+
+        for start in range(0, n, batch_size):
+            size = min(batch_size, n - start)
+            samples = {}
+            weights = np.ones(size)
+
+            for state in self.states:
+                index = tuple(samples[parent.name] for parent in state.parents)
+                probabilities = state.cpt[index] if index else np.broadcast_to(
+                    state.cpt, (size, len(state.values))
+                )
+
+                if state.name in evidence:
+                    value = state.index(evidence[state.name])
+                    samples[state.name] = np.full(size, value)
+                    weights *= probabilities[:, value]
+                else:
+                    # inverse CDF sampling of each row's distribution
+                    cumulative = np.cumsum(probabilities, axis=1)
+                    draws = rng.random(size)[:, None]
+                    samples[state.name] = np.minimum(
+                        (cumulative < draws).sum(axis=1), len(state.values) - 1
+                    )
+
+            totals += np.bincount(
+                samples[name], weights=weights, minlength=len(node.values)
+            )
+
+        return dict(zip(node.values, (totals / totals.sum()).tolist()))
+
+
+def multiply(factors, variables):
+    """
+    Returns the product of factors summed over every variable
+    not in `variables`, as an array with axes in that order.
+    """
+    operands = []
+    for factor_variables, table in factors:
+        operands += [table, list(factor_variables)]
+    return np.einsum(*operands, list(variables))
@@ -0,0 +1,147 @@
+import numpy as np
+import scipy.sparse
+
+# Fraction of non-zero entries beyond which matrix powers are multiplied
+# as dense arrays: powers of a sparse chain fill in after a few squarings
+DENSITY = 0.05
+
+
+class MarkovChain():
+    """
+    Markov chain over a finite set of states, with its transition matrix
+    stored as a SciPy CSR matrix: row i holds the probabilities of moving
+    from state i to every state, and only non-zero entries are stored, so
+    chains with thousands of states and few transitions each stay small.
+    """
+
+    def __init__(self, start, transitions, state_names=None):
+        self.start = np.asarray(start, dtype=float)
+        self.transitions = scipy.sparse.csr_matrix(transitions, dtype=float)
+        self.transitions.sort_indices()
+        if state_names is None:
+            state_names = list(range(len(self.start)))
+        self.state_names = list(state_names)
+
+        # cumulative probabilities of each row, offset by the row's index,
+        # so that they increase across the whole matrix and one sorted
+        # search finds the next state of every chain at once
+        rows = np.repeat(
+            np.arange(self.transitions.shape[0]), np.diff(self.transitions.indptr)
+        )
+        cumulative = np.cumsum(self.transitions.data)
+        row_start = np.concatenate(([0], cumulative))[self.transitions.indptr[:-1]]
+        self.cumulative = cumulative - np.repeat(
+            row_start, np.diff(self.transitions.indptr)
+        ) + rows
+
+    @classmethod
+    def from_table(cls, start, table):
+        """
+        Creates a chain from a dict mapping each state to its starting
+        probability, and a list of [state, next state, probability] rows.
+        """
+        state_names = list(start)
+        index = {state: i for i, state in enumerate(state_names)}
+        sources, targets, probabilities = zip(*table)
+        transitions = scipy.sparse.csr_matrix(
+            (probabilities,
+             ([index[state] for state in sources],
+              [index[state] for state in targets])),
+            shape=(len(state_names), len(state_names))
+        )
+        return cls([start[state] for state in state_names], transitions,
+                   state_names)
+
+    def sample(self, n, chains=1, seed=None):
+        """
+        Returns an array of `chains` independent samples of `n` states
+        each, as state indexes with one row per chain. Every chain moves
+        one step at a time together, by inverse CDF sampling.
+        """
+        rng = np.random.default_rng(seed)
+        samples = np.empty((chains, n), dtype=np.int64)
+        if not n:
+            return samples
+
+        cumulative = np.cumsum(self.start)
+        samples[:, 0] = np.minimum(
+            np.searchsorted(cumulative, rng.random(chains) * cumulative[-1],
+                            side="right"),
+            len(self.start) - 1
+        )
+
+        indptr = self.transitions.indptr
+        for t in range(1, n):
+            states = samples[:, t - 1]
+            positions = np.searchsorted(
+                self.cumulative, states + rng.random(chains), side="right"
+            )
+            # rounding may land just past the end of the row
+            positions = np.clip(positions, indptr[states], indptr[states + 1] - 1)
+            samples[:, t] = self.transitions.indices[positions]
+        return samples
+
+    def names(self, states):
+        """
+        Returns the list of the names of a sequence of state indexes.
+        """
+        return [self.state_names[state] for state in states]
+
+    def stationary(self, tolerance=1e-10, max_iterations=100000):
+        """
+        Returns the stationary distribution of the chain, from the starting
+        distribution, by power iteration until no probability changes by
+        more than `tolerance`.
+
+        Iterates the lazy chain (stay put with probability 1/2, else follow
+        the chain), which has the same stationary distribution but also
+        converges for periodic chains.
+        """
+        transposed = self.transitions.T.tocsr()
+        distribution = self.start / self.start.sum()
+        for _ in range(max_iterations):
+            following = (distribution + transposed @ distribution) / 2
+            if np.abs(following - distribution).max() < tolerance:
+                return following
+            distribution = following
+        return distribution
+
+    def n_step(self, n):
+        """
+        Returns the n-step transition matrix (the transition matrix to the
+        power `n`) by repeated squaring: O(log n) matrix products instead
+        of n.
+
+        Products stay sparse while the powers do, and the result is a CSR
+        matrix; once more than DENSITY of the entries are non-zero they are
+        computed as dense NumPy arrays, and the result is an array.
+        Callers only needing the distribution after n steps should use
+        `distribution`, which never builds a matrix power.
+        """
+        size = self.transitions.shape[0]
+        limit = DENSITY * size * size
+        result = scipy.sparse.identity(size, format="csr")
+        power = self.transitions
+        while n:
+            if scipy.sparse.issparse(power) and max(power.nnz, result.nnz) > limit:
+                power, result = power.toarray(), result.toarray()
+            if n & 1:
+                result = result @ power
+            n >>= 1
+            if n:
+                power = power @ power
+        return result
+
+    def distribution(self, n, start=None):
+        """
+        Returns the distribution of the state after `n` steps from `start`
+        (the starting distribution of the chain by default), by `n` sparse
+        matrix-vector products: O(n * transitions), with no matrix power.
+        """
+        transposed = self.transitions.T.tocsr()
+        distribution = np.asarray(
+            self.start if start is None else start, dtype=float
+        )
+        for _ in range(n):
+            distribution = transposed @ distribution
+        return distribution
@@ -0,0 +1,15 @@
+from markov import MarkovChain
+
+# Define starting probabilities and transition model
+model = MarkovChain.from_table({
+    "sun": 0.5,
+    "rain": 0.5
+}, [
+    ["sun", "sun", 0.8],
+    ["sun", "rain", 0.2],
+    ["rain", "sun", 0.3],
+    ["rain", "rain", 0.7]
+])
+
+# Sample 50 states from chain
+print(model.names(model.sample(50)[0]))
@@ -0,0 +1,29 @@
+from hidden import HiddenMarkovModel
+
+# Same model as model.py, without pomegranate
+model = HiddenMarkovModel.from_matrix(
+    [[0.8, 0.2],  # Tomorrow's predictions if today = sun
+     [0.3, 0.7]],  # Tomorrow's predictions if today = rain
+    [{"umbrella": 0.2, "no umbrella": 0.8},  # sun
+     {"umbrella": 0.9, "no umbrella": 0.1}],  # rain
+    [0.5, 0.5],
+    state_names=["sun", "rain"]
+)
+
+# Observed data
+observations = [
+    "umbrella",
+    "umbrella",
+    "no umbrella",
+    "umbrella",
+    "umbrella",
+    "umbrella",
+    "umbrella",
+    "no umbrella",
+    "no umbrella"
+]
+
+# Predict underlying states
+predictions = model.predict(observations)
+for prediction in predictions:
+    print(model.state_names[prediction])
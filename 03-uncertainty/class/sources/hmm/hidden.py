@@ -0,0 +1,207 @@
+import numpy as np
+
+# Observation index used to pad sequences shorter than the longest in a batch
+PADDING = -1
+
+
+class HiddenMarkovModel():
+    """
+    Hidden Markov model with its parameters stored as log probabilities,
+    so that long sequences do not underflow.
+
+    Sequences are decoded in batches: a batch is an integer array of
+    observation indexes with one row per sequence, padded with PADDING
+    after the end of shorter sequences, and every sequence of the batch
+    is advanced one step at a time together.
+    """
+
+    def __init__(self, starts, transitions, emissions, state_names, symbols):
+        self.state_names = list(state_names)
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        with np.errstate(divide="ignore"):
+            self.log_starts = np.log(np.asarray(starts, dtype=float))
+            self.log_transitions = np.log(np.asarray(transitions, dtype=float))
+            self.log_emissions = np.log(np.asarray(emissions, dtype=float))
+
+    @classmethod
+    def from_matrix(cls, transitions, distributions, starts, state_names):
+        """
+        Creates a model from a transition matrix, one dict per state
+        mapping each observation to its probability in that state, and
+        the starting probabilities.
+        """
+        symbols = []
+        for distribution in distributions:
+            for symbol in distribution:
+                if symbol not in symbols:
+                    symbols.append(symbol)
+        emissions = [
+            [distribution.get(symbol, 0) for symbol in symbols]
+            for distribution in distributions
+        ]
+        return cls(starts, transitions, emissions, state_names, symbols)
+
+    def encode(self, sequences):
+        """
+        Returns a batch of sequences of observations as a padded array of
+        observation indexes, and the array of their lengths.
+        """
+        lengths = np.array([len(sequence) for sequence in sequences])
+        batch = np.full((len(sequences), lengths.max(initial=0)), PADDING)
+        for row, sequence in zip(batch, sequences):
+            row[:len(sequence)] = [self.index[symbol] for symbol in sequence]
+        return batch, lengths
+
+    def emissions(self, observations):
+        """
+        Returns the log probability of each observation in each state, as an
+        array with one more axis than `observations`; zero for padding.
+        """
+        padded = observations == PADDING
+        log_emissions = self.log_emissions.T[np.where(padded, 0, observations)]
+        log_emissions[padded] = 0
+        return log_emissions
+
+    def viterbi(self, batch):
+        """
+        Returns the most likely sequence of states for each sequence of a
+        padded batch, as an array of state indexes padded like the batch,
+        and the array of the log probabilities of those sequences.
+        """
+        size, steps = batch.shape
+        if not steps:
+            # only empty sequences, whose probability is 1
+            return np.empty((size, 0), dtype=np.int64), np.zeros(size)
+
+        padded = batch == PADDING
+        emissions = self.emissions(batch)
+        states = len(self.state_names)
+
+        scores = self.log_starts + emissions[:, 0]
+        pointers = np.empty((size, steps, states), dtype=np.int64)
+        pointers[:, 0] = np.arange(states)
+        for t in range(1, steps):
+            candidates = scores[:, :, None] + self.log_transitions
+            pointers[:, t] = candidates.argmax(axis=1)
+            best = np.take_along_axis(
+                candidates, pointers[:, t, None, :], axis=1
+            )[:, 0] + emissions[:, t]
+
+            # finished sequences keep their scores, and their states
+            pointers[padded[:, t], t] = np.arange(states)
+            scores = np.where(padded[:, t, None], scores, best)
+
+        paths = np.empty((size, steps), dtype=np.int64)
+        paths[:, -1] = scores.argmax(axis=1)
+        for t in range(steps - 1, 0, -1):
+            paths[:, t - 1] = pointers[np.arange(size), t, paths[:, t]]
+        paths[padded] = PADDING
+
+        return paths, scores.max(axis=1)
+
+    def forward_backward(self, batch):
+        """
+        Returns the posterior probability of each state at each step of each
+        sequence of a padded batch, as an array of shape (sequences, steps,
+        states) with zeros for padding, and the array of the log likelihoods
+        of the sequences.
+        """
+        size, steps = batch.shape
+        if not steps:
+            # only empty sequences, whose likelihood is 1
+            return np.zeros((size, 0, len(self.state_names))), np.zeros(size)
+
+        padded = batch == PADDING
+        emissions = self.emissions(batch)
+
+        forward = np.empty(emissions.shape)
+        forward[:, 0] = self.log_starts + emissions[:, 0]
+        for t in range(1, steps):
+            step = logsumexp(
+                forward[:, t - 1, :, None] + self.log_transitions, axis=1
+            ) + emissions[:, t]
+            forward[:, t] = np.where(padded[:, t, None], forward[:, t - 1], step)
+
+        # the last step of a sequence has a backward message of log 1 = 0,
+        # which padding carries back from the end of the batch
+        backward = np.zeros(emissions.shape)
+        for t in range(steps - 2, -1, -1):
+            step = logsumexp(
+                self.log_transitions
+                + (emissions[:, t + 1] + backward[:, t + 1])[:, None, :],
+                axis=2
+            )
+            backward[:, t] = np.where(padded[:, t + 1, None], 0, step)
+
+        likelihoods = logsumexp(forward[:, -1], axis=1)
+        posteriors = np.exp(forward + backward - likelihoods[:, None, None])
+        posteriors[padded] = 0
+        return posteriors, likelihoods
+
+    def predict(self, sequence, algorithm="map"):
+        """
+        Returns the list of the indexes of the most likely states for a
+        sequence of observations: the most likely state at each step given
+        the whole sequence ("map", like pomegranate's default), or the most
+        likely sequence of states ("viterbi").
+        """
+        batch, _ = self.encode([sequence])
+        if algorithm == "map":
+            posteriors, _ = self.forward_backward(batch)
+            return posteriors[0].argmax(axis=1).tolist()
+        if algorithm == "viterbi":
+            paths, _ = self.viterbi(batch)
+            return paths[0].tolist()
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    def decode(self, sequences, batch_size=10000):
+        """
+        Yields the most likely sequence of state names for each sequence of
+        observations in the iterable `sequences`, `batch_size` at a time.
+        """
+        sequences = iter(sequences)
+        while True:
+            batch = [
+                sequence for _, sequence in zip(range(batch_size), sequences)
+            ]
+            if not batch:
+                return
+            observations, lengths = self.encode(batch)
+            paths, _ = self.viterbi(observations)
+            for path, length in zip(paths.tolist(), lengths):
+                yield [self.state_names[state] for state in path[:length]]
+
+    def filter(self, observations):
+        """
+        Yields, after each observation of the (possibly unbounded) iterable
+        `observations`, the distribution of the current state given every
+        observation so far, as a dict mapping state names to probabilities.
+        Only the current distribution is kept in memory.
+        """
+        belief = None
+        for observation in observations:
+            emission = self.log_emissions[:, self.index[observation]]
+            if belief is None:
+                belief = self.log_starts + emission
+            else:
+                belief = logsumexp(
+                    belief[:, None] + self.log_transitions, axis=0
+                ) + emission
+
+            # normalize, so that the belief never underflows
+            belief = belief - logsumexp(belief, axis=0)
+            yield dict(zip(self.state_names, np.exp(belief).tolist()))
+
+
+def logsumexp(values, axis):
+    """
+    Returns log(sum(exp(values))) along `axis`, without overflow
+    or underflow.
+    """
+    largest = values.max(axis=axis, keepdims=True)
+    largest = np.where(np.isfinite(largest), largest, 0)
+    with np.errstate(divide="ignore"):
+        total = np.log(np.exp(values - largest).sum(axis=axis, keepdims=True))
+    return np.squeeze(total + largest, axis=axis)
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import compute_probabilities, load_data, split_families
+
+# Data files sent to a process together: few, since a single large
+# family can take far longer to solve than many small ones
+CHUNKSIZE = 8
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python batch.py (directory | manifest.txt)")
+
+    # Print one JSON line per data file, as soon as it is solved
+    for result in solve_all(data_files(sys.argv[1])):
+        print(json.dumps(result), flush=True)
+
+
+def data_files(source):
+    """
+    Return the list of data files in directory `source`, or listed one per
+    line in the manifest file `source` (relative paths being relative to
+    the manifest's directory).
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, filename)
+            for filename in os.listdir(source)
+            if filename.endswith(".csv")
+        )
+
+    directory = os.path.dirname(source)
+    with open(source) as f:
+        return [
+            os.path.join(directory, line.strip())
+            for line in f
+            if line.strip()
+        ]
+
+
+def solve_all(filenames, workers=None):
+    """
+    Solve data files in parallel over `workers` processes, yielding their
+    results in the order of `filenames` as they are ready.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(solve, filenames, chunksize=CHUNKSIZE)
+
+
+def solve(filename):
+    """
+    Load and solve a data file.
+
+    Return a dictionary with the file name, the number of people and of
+    unrelated families in it, the time taken in seconds, and the gene and
+    trait probabilities of each person (or the error, if the file could
+    not be solved).
+    """
+    start = time.perf_counter()
+    result = {"file": filename}
+    try:
+        people = load_data(filename)
+        result["people"] = len(people)
+        result["families"] = len(split_families(people))
+        result["probabilities"] = compute_probabilities(people)
+    except (OSError, KeyError, ValueError) as e:
+        result["error"] = repr(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import sys
+import time
+
+from heredity import (
+    PROBS, family_members, joint_probability, load_data, powerset
+)
+
+FILES = ["data/family0.csv", "data/family1.csv", "data/family2.csv"]
+
+
+def main():
+    filenames = sys.argv[1:] or FILES
+    for filename in filenames:
+        people = load_data(filename)
+        assignments = list(all_assignments(people))
+
+        before = per_call(branching_joint_probability, people, assignments)
+        # the family structure is read once, as enumerate_probabilities does
+        after = per_call(
+            joint_probability, people, assignments, family_members(people)
+        )
+
+        print(f"{filename}: {len(assignments)} joint probabilities")
+        print(f"  Before: {before * 1e6:.2f}us per call")
+        print(f"  After: {after * 1e6:.2f}us per call ({before / after:.1f}x)")
+
+
+def all_assignments(people):
+    """
+    Yield every (one_gene, two_genes, have_trait) assignment of `people`.
+    """
+    names = set(people)
+    for have_trait in powerset(names):
+        for one_gene in powerset(names):
+            for two_genes in powerset(names - one_gene):
+                yield one_gene, two_genes, have_trait
+
+
+def per_call(function, people, assignments, *args):
+    """
+    Return the average time, in seconds, of a call of `function` over
+    every assignment (followed by `args`), checking it agrees with
+    joint_probability.
+    """
+    start = time.perf_counter()
+    results = [
+        function(people, *assignment, *args) for assignment in assignments
+    ]
+    elapsed = time.perf_counter() - start
+
+    for assignment, p in zip(assignments, results):
+        if abs(p - joint_probability(people, *assignment)) > 1e-12:
+            raise AssertionError(f"{function.__name__} differs on {assignment}")
+
+    return elapsed / len(assignments)
+
+
+def branching_joint_probability(people, one_gene, two_genes, have_trait):
+    """
+    Compute and return a joint probability, the way joint_probability did
+    before TRANSMISSION: branching on the parents' genes for each person.
+
+    The probability returned should be the probability that
+        * everyone in set `one_gene` has one copy of the gene, and
+        * everyone in set `two_genes` has two copies of the gene, and
+        * everyone not in `one_gene` or `two_gene` does not have the gene, and
+        * everyone in set `have_trait` has the trait, and
+        * everyone not in set` have_trait` does not have the trait.
+    """
+
+    names = set(people.keys())
+
+    # initial joint probability
+    joint_prob = 1
+
+    for p in names:
+
+        # gather parents' probabilities
+        mother = people[p]['mother']
+        father = people[p]['father']
+        if mother in one_gene:
+            # mother has one copy of the mutated gene, then she will pass 
+            # the specific gene with probability 0.5
+            # however, there's a chance the gene will modify (0.01)
+            # so she can pass the mutated gene AND it mutate: 0.5 * 0.01, 
+            # OR she doesnt pass the mutated gene AND it does not mutate: 0.5 *0.99 
+            # which is just 0.5
+            mother_prob = 0.5 
+        elif mother in two_genes:
+            # mother has prob of 1 - mutation
+            # probability of getting the gene from mother:
+            mother_prob = 1 - PROBS["mutation"]
+        else:
+            # mother has prob of 0 + mutation
+            # the probability is just by mutation in this scenario
+            mother_prob = PROBS["mutation"]
+        
+        if father in one_gene:
+            father_prob = 0.5
+        elif father in two_genes:
+            father_prob = 1 - PROBS["mutation"]
+        else:
+            father_prob = PROBS["mutation"]
+
+        if p in one_gene:
+            # if no parent is listed:
+            if people[p]['mother'] is None and people[p]['father'] is None: 
+                prob = PROBS['gene'][1]
+            else:
+                # if p is a children, then it has a probability of receiving 
+                # the gene from the parents
+
+                # For someone to have EXACTLY 1 copy, then, the possiblities are either:
+                # get from father AND not mother
+                # OR 
+                # get from mother AND not father
+                prob = father_prob * (1 - mother_prob) + mother_prob * (1 - father_prob)
+                
+            no_trait = PROBS['trait'][1][False]
+            trait = PROBS['trait'][1][True]
+        elif p in two_genes:
+            # if no parent is listed:
+            if people[p]['mother'] is None and people[p]['father'] is None: 
+                prob = PROBS['gene'][2]
+            else:
+                # if parent is listed
+                
+                # For someone to have EXACTLY 2 copies, then, the possiblities are only:
+                # both mother and father pass the gene (recall it's already taking into account
+                # the mutation in [mother/father]_prob)
+                prob = mother_prob * father_prob
+
+            no_trait = PROBS['trait'][2][False]
+            trait = PROBS['trait'][2][True]
+
+        else:
+            if people[p]['mother'] is None and people[p]['father'] is None: 
+                prob = PROBS['gene'][0]
+            else:
+                # if parent is listed
+
+                # For someone to have EXACTLY 0 copies, then, the possiblities are only:
+                # get 0 from mother AND 0 from father
+                prob = (1-mother_prob) * (1-father_prob)
+
+            no_trait = PROBS['trait'][0][False]
+            trait = PROBS['trait'][0][True]
+
+        if p in have_trait:
+            final_trait = trait
+        else:
+            final_trait = no_trait
+
+        joint_prob *= prob * final_trait
+
+    return joint_prob
+
+
+if __name__ == "__main__":
+    main()
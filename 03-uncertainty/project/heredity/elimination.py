@@ -0,0 +1,193 @@
+"""
+Exact inference over a family tree by variable elimination.
+
+Each person has one variable, their number of copies of the gene (0, 1 or 2).
+The family tree (a Bayesian network) is turned into factors: one per person
+for their gene given their parents' genes, and one per known trait for the
+probability of that trait given the gene. A factor is a pair of a tuple of
+names and a dict mapping each assignment of their genes (a tuple of gene
+counts, in the same order) to a probability.
+
+The gene distribution of a person is obtained by multiplying all factors and
+summing out everyone else one at a time, in an order that keeps the
+intermediate factors small. Traits which are not known only depend on the
+person's own gene, so they are computed from the gene distribution.
+"""
+import itertools
+
+GENES = (0, 1, 2)
+
+
+def inherit_probabilities(probs):
+    """
+    Returns a dict mapping a parent's gene count to the probability
+    that they pass the gene on to their child, mutation included.
+    """
+    return {
+        0: probs["mutation"],
+        1: 0.5,
+        2: 1 - probs["mutation"]
+    }
+
+
+def child_probabilities(probs):
+    """
+    Returns a dict mapping (child, mother, father) gene counts to the
+    probability of the child's gene count given their parents'.
+    """
+    inherit = inherit_probabilities(probs)
+    table = {}
+    for mother, father in itertools.product(GENES, repeat=2):
+        from_mother, from_father = inherit[mother], inherit[father]
+        table[(0, mother, father)] = (1 - from_mother) * (1 - from_father)
+        table[(1, mother, father)] = (
+            from_mother * (1 - from_father) + from_father * (1 - from_mother)
+        )
+        table[(2, mother, father)] = from_mother * from_father
+    return table
+
+
+def family_factors(people, probs):
+    """
+    Returns the list of factors of a family tree, with known traits
+    as evidence.
+    """
+    children = child_probabilities(probs)
+    factors = []
+    for person in people:
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        if mother is None and father is None:
+            factors.append((
+                (person,),
+                {(gene,): probs["gene"][gene] for gene in GENES}
+            ))
+        else:
+            factors.append(((person, mother, father), dict(children)))
+
+        trait = people[person]["trait"]
+        if trait is not None:
+            factors.append((
+                (person,),
+                {(gene,): probs["trait"][gene][trait] for gene in GENES}
+            ))
+    return factors
+
+
+def multiply(factors):
+    """
+    Returns the product of a list of factors.
+    """
+    variables = []
+    for names, _ in factors:
+        for name in names:
+            if name not in variables:
+                variables.append(name)
+
+    # position of each factor's variables within the product's
+    positions = [
+        [variables.index(name) for name in names] for names, _ in factors
+    ]
+
+    table = {}
+    for assignment in itertools.product(GENES, repeat=len(variables)):
+        p = 1
+        for (_, factor), position in zip(factors, positions):
+            p *= factor[tuple(assignment[i] for i in position)]
+            if not p:
+                break
+        table[assignment] = p
+    return tuple(variables), table
+
+
+def sum_out(name, factor):
+    """
+    Returns a factor with variable `name` summed out.
+    """
+    names, table = factor
+    i = names.index(name)
+    summed = {}
+    for assignment, p in table.items():
+        key = assignment[:i] + assignment[i + 1:]
+        summed[key] = summed.get(key, 0) + p
+    return names[:i] + names[i + 1:], summed
+
+
+def elimination_order(factors, keep):
+    """
+    Returns an order in which to eliminate every variable but `keep`.
+
+    Greedily picks the variable whose elimination creates the smallest
+    factor (fewest neighbours), breaking ties by fewest fill-in edges
+    between those neighbours.
+    """
+    neighbours = {}
+    for names, _ in factors:
+        for name in names:
+            neighbours.setdefault(name, set()).update(names)
+    for name in neighbours:
+        neighbours[name].discard(name)
+
+    def cost(name):
+        around = neighbours[name]
+        fill = sum(
+            1 for a, b in itertools.combinations(around, 2)
+            if b not in neighbours[a]
+        )
+        return len(around), fill
+
+    order = []
+    remaining = set(neighbours) - {keep}
+    while remaining:
+        name = min(sorted(remaining), key=cost)
+        around = neighbours.pop(name)
+        for other in around:
+            neighbours[other].discard(name)
+            neighbours[other].update(around - {other})
+        remaining.remove(name)
+        order.append(name)
+    return order
+
+
+def gene_distribution(factors, person):
+    """
+    Returns the normalized distribution of `person`'s gene count
+    given the factors.
+    """
+    for name in elimination_order(factors, person):
+        involved = [factor for factor in factors if name in factor[0]]
+        factors = [factor for factor in factors if name not in factor[0]]
+        factors.append(sum_out(name, multiply(involved)))
+
+    names, table = multiply(
+        [factor for factor in factors if person in factor[0]]
+    )
+    total = sum(table.values())
+    return {gene: table[(gene,)] / total for gene in GENES}
+
+
+def family_probabilities(people, probs):
+    """
+    Returns, for every person, their normalized "gene" and "trait"
+    distributions given the known traits, in the same format as
+    heredity.main's `probabilities`.
+    """
+    factors = family_factors(people, probs)
+
+    probabilities = {}
+    for person in people:
+        gene = gene_distribution(factors, person)
+
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(
+                gene[count] * probs["trait"][count][True] for count in GENES
+            )
+        else:
+            has_trait = 1 if trait else 0
+
+        probabilities[person] = {
+            "gene": {count: gene[count] for count in (2, 1, 0)},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
@@ -2,6 +2,9 @@ import csv
 import itertools
 import sys
 
+from elimination import child_probabilities, family_probabilities
+from vectorized import MAX_SIZE, table_size, tensor_probabilities
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -36,6 +39,23 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Probability of someone with no parent listed having a gene count and
+# (or not) the trait, indexed by (gene, trait)
+FOUNDER = {
+    (gene, trait): PROBS["gene"][gene] * PROBS["trait"][gene][trait]
+    for gene in PROBS["gene"]
+    for trait in (True, False)
+}
+
+# Probability of a child having a gene count and (or not) the trait given
+# their mother's and father's gene counts, indexed by
+# (child, mother, father, trait)
+TRANSMISSION = {
+    (child, mother, father, trait): p * PROBS["trait"][child][trait]
+    for (child, mother, father), p in child_probabilities(PROBS).items()
+    for trait in (True, False)
+}
+
 
 def main():
 
@@ -44,6 +64,78 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
+    # Compute gene and trait probabilities for each person
+    probabilities = compute_probabilities(people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def compute_probabilities(people):
+    """
+    Compute gene and trait probabilities for each person.
+
+    Families which are not related to each other are solved independently.
+    Each is solved by enumerating every assignment at once with NumPy for
+    moderate family sizes (see vectorized.py), and by variable elimination
+    otherwise (see elimination.py).
+    """
+    probabilities = dict()
+    for family in split_families(people):
+        if table_size(family) <= MAX_SIZE:
+            probabilities.update(tensor_probabilities(family, PROBS))
+        else:
+            probabilities.update(family_probabilities(family, PROBS))
+
+    # Keep the order of the data file
+    return {person: probabilities[person] for person in people}
+
+
+def split_families(people):
+    """
+    Split `people` into families which are not related to each other,
+    i.e. the connected components of the family tree.
+    Return a list of dictionaries in the same format as `people`.
+    """
+    relatives = {person: set() for person in people}
+    for person in people:
+        for parent in (people[person]["mother"], people[person]["father"]):
+            if parent is not None:
+                relatives[person].add(parent)
+                relatives[parent].add(person)
+
+    families = []
+    seen = set()
+    for person in people:
+        if person in seen:
+            continue
+        seen.add(person)
+        family = []
+        frontier = [person]
+        while frontier:
+            relative = frontier.pop()
+            family.append(relative)
+            for other in relatives[relative] - seen:
+                seen.add(other)
+                frontier.append(other)
+        families.append({name: people[name] for name in family})
+
+    return families
+
+
+def enumerate_probabilities(people):
+    """
+    Compute gene and trait probabilities for each person by enumerating
+    every combination of genes and traits, which takes O(6^n) calls to
+    `joint_probability` for n people.
+    """
+
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -62,6 +154,7 @@ def main():
 
     # Loop over all sets of people who might have the trait
     names = set(people)
+    members = family_members(people)
     for have_trait in powerset(names):
 
         # Check if current set of people violates known information
@@ -78,21 +171,15 @@ def main():
             for two_genes in powerset(names - one_gene):
 
                 # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                #p = joint_probability(people, {"Harry"}, {"James"}, {"James"})
+                p = joint_probability(
+                    people, one_gene, two_genes, have_trait, members
+                )
                 update(probabilities, one_gene, two_genes, have_trait, p)
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -129,7 +216,26 @@ def powerset(s):
     ]
 
 
-def joint_probability(people, one_gene, two_genes, have_trait):
+def family_members(people):
+    """
+    Return the members of `people` as (name, mother, father) tuples, where
+    mother and father are positions in the list, or None for founders, and
+    a parent missing from `people` is at position -1.
+    """
+    position = {name: i for i, name in enumerate(people)}
+    members = []
+    for name, person in people.items():
+        mother, father = person["mother"], person["father"]
+        if mother is None and father is None:
+            members.append((name, None, None))
+        else:
+            members.append(
+                (name, position.get(mother, -1), position.get(father, -1))
+            )
+    return members
+
+
+def joint_probability(people, one_gene, two_genes, have_trait, members=None):
     """
     Compute and return a joint probability.
 
@@ -139,92 +245,38 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone not in `one_gene` or `two_gene` does not have the gene, and
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
-    """
 
-    names = set(people.keys())
+    The probability of each person's genes and trait given their parents'
+    genes is looked up in FOUNDER or TRANSMISSION, computed once for every
+    combination, instead of being worked out for every call.
 
-    # initial joint probability
-    joint_prob = 1
+    `members` is family_members(people), which callers computing many joint
+    probabilities of the same family may pass to read its structure once.
+    """
 
-    for p in names:
-
-        # gather parents' probabilities
-        mother = people[p]['mother']
-        father = people[p]['father']
-        if mother in one_gene:
-            # mother has one copy of the mutated gene, then she will pass 
-            # the specific gene with probability 0.5
-            # however, there's a chance the gene will modify (0.01)
-            # so she can pass the mutated gene AND it mutate: 0.5 * 0.01, 
-            # OR she doesnt pass the mutated gene AND it does not mutate: 0.5 *0.99 
-            # which is just 0.5
-            mother_prob = 0.5 
-        elif mother in two_genes:
-            # mother has prob of 1 - mutation
-            # probability of getting the gene from mother:
-            mother_prob = 1 - PROBS["mutation"]
-        else:
-            # mother has prob of 0 + mutation
-            # the probability is just by mutation in this scenario
-            mother_prob = PROBS["mutation"]
-        
-        if father in one_gene:
-            father_prob = 0.5
-        elif father in two_genes:
-            father_prob = 1 - PROBS["mutation"]
-        else:
-            father_prob = PROBS["mutation"]
-
-        if p in one_gene:
-            # if no parent is listed:
-            if people[p]['mother'] is None and people[p]['father'] is None: 
-                prob = PROBS['gene'][1]
-            else:
-                # if p is a children, then it has a probability of receiving 
-                # the gene from the parents
-
-                # For someone to have EXACTLY 1 copy, then, the possiblities are either:
-                # get from father AND not mother
-                # OR 
-                # get from mother AND not father
-                prob = father_prob * (1 - mother_prob) + mother_prob * (1 - father_prob)
-                
-            no_trait = PROBS['trait'][1][False]
-            trait = PROBS['trait'][1][True]
-        elif p in two_genes:
-            # if no parent is listed:
-            if people[p]['mother'] is None and people[p]['father'] is None: 
-                prob = PROBS['gene'][2]
-            else:
-                # if parent is listed
-                
-                # For someone to have EXACTLY 2 copies, then, the possiblities are only:
-                # both mother and father pass the gene (recall it's already taking into account
-                # the mutation in [mother/father]_prob)
-                prob = mother_prob * father_prob
-
-            no_trait = PROBS['trait'][2][False]
-            trait = PROBS['trait'][2][True]
+    if members is None:
+        members = family_members(people)
 
-        else:
-            if people[p]['mother'] is None and people[p]['father'] is None: 
-                prob = PROBS['gene'][0]
-            else:
-                # if parent is listed
+    # number of copies of the gene of each person, by position, followed
+    # by 0 for parents missing from `people`
+    genes = [
+        2 if name in two_genes else 1 if name in one_gene else 0
+        for name, _, _ in members
+    ]
+    genes.append(0)
 
-                # For someone to have EXACTLY 0 copies, then, the possiblities are only:
-                # get 0 from mother AND 0 from father
-                prob = (1-mother_prob) * (1-father_prob)
+    # initial joint probability
+    joint_prob = 1
 
-            no_trait = PROBS['trait'][0][False]
-            trait = PROBS['trait'][0][True]
+    for i, (name, mother, father) in enumerate(members):
 
-        if p in have_trait:
-            final_trait = trait
+        # if no parent is listed, use the unconditional probability
+        if mother is None:
+            joint_prob *= FOUNDER[genes[i], name in have_trait]
         else:
-            final_trait = no_trait
-
-        joint_prob *= prob * final_trait
+            joint_prob *= TRANSMISSION[
+                genes[i], genes[mother], genes[father], name in have_trait
+            ]
 
     return joint_prob
 
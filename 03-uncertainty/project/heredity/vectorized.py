@@ -0,0 +1,104 @@
+"""
+Exact inference over a family tree by vectorized enumeration.
+
+The joint probability of every assignment is computed at once as a NumPy
+array with one axis per person's gene count (0, 1 or 2) and one axis per
+unknown trait (False, True). Known traits are evidence: their axis is
+selected by indexing instead of being enumerated. Marginals are then sums
+over every other axis.
+
+The array has 3^n * 2^u entries for n people with u unknown traits, so this
+is a fast path for small to moderate family sizes (up to about 7 people);
+larger families should use variable elimination (see elimination.py).
+"""
+import numpy as np
+
+from elimination import GENES, child_probabilities
+
+# Largest number of entries of the joint probability array; beyond that,
+# variable elimination is faster
+MAX_SIZE = 1 << 16
+
+
+def table_size(people):
+    """
+    Returns the number of entries of the joint probability array of a
+    family, to be compared with MAX_SIZE.
+    """
+    unknown = sum(person["trait"] is None for person in people.values())
+    return 3 ** len(people) * 2 ** unknown
+
+
+def family_tensor(people, probs):
+    """
+    Returns the joint probability array of a family, the list of people
+    in the order of the gene axes, and the list of people with an unknown
+    trait in the order of the trait axes (which follow the gene axes).
+    """
+    names = list(people)
+    unknown = [name for name in names if people[name]["trait"] is None]
+    if table_size(people) > MAX_SIZE:
+        raise ValueError(
+            f"Family of {len(names)} people is too large to enumerate"
+        )
+
+    gene_axis = {name: i for i, name in enumerate(names)}
+    trait_axis = {name: len(names) + i for i, name in enumerate(unknown)}
+
+    founder = np.array([probs["gene"][gene] for gene in GENES])
+    child = np.zeros((3, 3, 3))
+    for (gene, mother, father), p in child_probabilities(probs).items():
+        child[gene, mother, father] = p
+    trait = np.array([
+        [probs["trait"][gene][False], probs["trait"][gene][True]]
+        for gene in GENES
+    ])
+
+    # einsum operands: each factor followed by the axes it spans
+    operands = []
+    for name in names:
+        mother = people[name]["mother"]
+        father = people[name]["father"]
+        if mother is None and father is None:
+            operands += [founder, [gene_axis[name]]]
+        else:
+            operands += [
+                child, [gene_axis[name], gene_axis[mother], gene_axis[father]]
+            ]
+
+        if name in trait_axis:
+            operands += [trait, [gene_axis[name], trait_axis[name]]]
+        else:
+            # known trait: only the slice matching the evidence is kept
+            operands += [trait[:, int(people[name]["trait"])], [gene_axis[name]]]
+
+    joint = np.einsum(*operands, list(range(len(names) + len(unknown))))
+    return joint, names, unknown
+
+
+def tensor_probabilities(people, probs):
+    """
+    Returns, for every person, their normalized "gene" and "trait"
+    distributions given the known traits, in the same format as
+    heredity.main's `probabilities`.
+    """
+    joint, names, unknown = family_tensor(people, probs)
+    axes = set(range(joint.ndim))
+
+    probabilities = {}
+    for i, name in enumerate(names):
+        gene = joint.sum(axis=tuple(axes - {i}))
+        gene /= gene.sum()
+
+        if name in unknown:
+            axis = len(names) + unknown.index(name)
+            trait = joint.sum(axis=tuple(axes - {axis}))
+            has_trait = float(trait[1] / trait.sum())
+        else:
+            has_trait = 1 if people[name]["trait"] else 0
+
+        probabilities[name] = {
+            "gene": {count: float(gene[count]) for count in (2, 1, 0)},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
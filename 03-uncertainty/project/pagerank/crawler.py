@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from linkgraph import LinkGraph
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Bytes read from a file at a time
+BUFFER_SIZE = 1 << 16
+
+# Parsing a page takes little time next to sending it to a process, so
+# pages are sent in batches
+CHUNKSIZE = 64
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python crawler.py corpus graph.npz")
+
+    start = time.perf_counter()
+    graph = crawl_graph(sys.argv[1])
+    graph.save(sys.argv[2])
+    elapsed = time.perf_counter() - start
+
+    print(f"Crawled {len(graph)} pages and {len(graph.link_targets)} links "
+          f"in {elapsed:.2f}s into {sys.argv[2]}")
+
+
+def parse_links(path):
+    """
+    Returns the set of pages linked to by the HTML file at `path`.
+
+    The file is read BUFFER_SIZE characters at a time rather than as a
+    whole. Whatever follows the last "<" of the buffer may be an
+    incomplete tag, so it is kept for the next read.
+    """
+    links = set()
+    pending = ""
+    with open(path) as f:
+        while True:
+            data = f.read(BUFFER_SIZE)
+            pending += data
+            cut = pending.rfind("<") if data else len(pending)
+            if cut == -1:
+                cut = len(pending)
+            links.update(LINK.findall(pending, 0, cut))
+            pending = pending[cut:]
+            if not data:
+                break
+    return links
+
+
+def crawl_graph(directory, workers=None):
+    """
+    Parses a directory of HTML pages in parallel over `workers` processes
+    and returns their LinkGraph.
+
+    Page names are interned as integers (their position in the sorted list
+    of pages), and only links to other pages in the corpus are kept.
+    """
+    pages = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+
+    sources = []
+    targets = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # results are consumed as they arrive, in the order of `pages`
+        links = executor.map(parse_links, paths, chunksize=CHUNKSIZE)
+        for source, page_links in enumerate(links):
+            for link in page_links:
+                target = index.get(link)
+                if target is not None and target != source:
+                    sources.append(source)
+                    targets.append(target)
+
+    return LinkGraph(pages, sources, targets)
+
+
+if __name__ == "__main__":
+    main()
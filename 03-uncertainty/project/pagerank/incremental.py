@@ -0,0 +1,339 @@
+import random
+import sys
+import time
+
+import numpy as np
+
+from linkgraph import LinkGraph, power_iteration
+
+DAMPING = 0.85
+TOLERANCE = 1e-6
+
+# Links added and removed by the demo in main
+CHANGES = 10
+
+# A push round over more than this fraction of the pages multiplies by the
+# whole link matrix instead of gathering the links of the pushed pages
+DENSE = 1 / 8
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python incremental.py graph.npz")
+
+    graph = LinkGraph.load(sys.argv[1])
+    pagerank = IncrementalPageRank(graph, DAMPING, TOLERANCE)
+
+    # remove some existing links and add as many new ones
+    sources = np.repeat(np.arange(len(graph)), graph.outdegree)
+    removed = random.sample(range(len(sources)), min(CHANGES, len(sources)))
+    remove_links = [
+        (graph.pages[sources[k]], graph.pages[graph.link_targets[k]])
+        for k in removed
+    ]
+    add_links = [
+        tuple(random.sample(graph.pages, 2)) for _ in range(CHANGES)
+    ]
+
+    report = pagerank.update(
+        add_links=add_links, remove_links=remove_links, compare=True
+    )
+    print(f"Updated PageRank of {len(pagerank.graph)} pages after "
+          f"{len(remove_links)} links removed and {len(add_links)} added")
+    print(f"  Incremental: {report['pushes']} pushes "
+          f"({report['iterations']:.2f} iterations worth of links) "
+          f"in {report['seconds'] * 1000:.1f}ms")
+    print(f"  Cold run: {report['cold_iterations']} iterations "
+          f"in {report['cold_seconds'] * 1000:.1f}ms")
+    print(f"  Largest difference: {report['difference']:.2e}")
+
+
+class IncrementalPageRank():
+    """
+    PageRank of a corpus kept up to date as pages and links change.
+
+    Since pages with no links are interpreted as linking to every page,
+    just like the random surf, PageRank is proportional to the solution of
+
+        score = (1 - d) + d * M score
+
+    where M only follows actual links. Unlike PageRank, that system does
+    not involve N or the rank of every dangling page, so a change to the
+    links of a page only changes the residual
+
+        residual = (1 - d) + d * M score - score
+
+    of the pages it links to. Updates start from the previous scores and
+    push residuals from those pages only (Gauss-Southwell style), instead
+    of restarting from the uniform distribution.
+    """
+
+    def __init__(self, graph, damping_factor, tolerance=TOLERANCE):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+
+        ranks, _ = power_iteration(graph, damping_factor, tolerance)
+
+        # rescale ranks into scores: summing the score equation over all
+        # pages gives sum(score) = N - d / (1 - d) * sum(score of dangling)
+        dangling = ranks[graph.dangling].sum()
+        scale = len(graph) / (1 + damping_factor * dangling / (1 - damping_factor))
+        self.scores = ranks * scale
+        self.residuals = (1 - damping_factor) + (
+            damping_factor * (graph.matrix @ self.scores) - self.scores
+        )
+
+    @property
+    def ranks(self):
+        """
+        Returns a dictionary mapping each page name to its PageRank.
+        """
+        return self.graph.to_dict(self.scores / self.scores.sum())
+
+    def update(self, add_pages=(), remove_pages=(), add_links=(),
+               remove_links=(), compare=False):
+        """
+        Applies changes to the corpus and updates PageRank. Links are
+        (source, target) pairs of page names; the links of removed pages,
+        and links to pages outside the corpus, are dropped. The page list
+        and index of the previous graph are changed in place and shared
+        by the new one.
+
+        Returns a report with the number of pushes, the work they took
+        measured in power iterations (links followed / links in the corpus)
+        and the time taken. If `compare` is True, a cold run from the
+        uniform distribution is also timed, and the largest difference
+        between both results reported.
+        """
+        start = time.perf_counter()
+        old = self.graph
+        d = self.damping_factor
+
+        # reuse the page list and index of the previous graph: the last
+        # pages move into the numbers of removed pages, so that only as
+        # many pages as were removed are renumbered, and new pages follow
+        removed = set(remove_pages) & old.index.keys()
+        added = [
+            page for page in dict.fromkeys(add_pages)
+            if page not in old.index and page not in removed
+        ]
+        pages, index = old.pages, old.index
+        remap = np.arange(len(old))
+        if removed:
+            numbers = np.array(sorted(index[page] for page in removed))
+            size = len(old) - len(numbers)
+            holes = numbers[numbers < size]
+            movers = np.setdiff1d(np.arange(size, len(old)), numbers)
+            remap[numbers] = -1
+            remap[movers] = holes
+
+            for page in removed:
+                del index[page]
+            for hole, mover in zip(holes.tolist(), movers.tolist()):
+                pages[hole] = pages[mover]
+                index[pages[hole]] = hole
+            del pages[size:]
+
+            # old page of every remaining page, in their new order
+            origin = np.arange(size)
+            origin[holes] = movers
+
+            # old links of the remaining pages, in that order and
+            # renumbered: runs of pages which kept their number are copied
+            # whole, with the links of a moved page in place of each hole
+            pieces = []
+            first = 0
+            for hole, mover in zip(holes.tolist(), movers.tolist()):
+                pieces.append(old.link_targets[
+                    old.link_offsets[first]:old.link_offsets[hole]
+                ])
+                pieces.append(old.link_targets[
+                    old.link_offsets[mover]:old.link_offsets[mover + 1]
+                ])
+                first = hole + 1
+            pieces.append(old.link_targets[
+                old.link_offsets[first]:old.link_offsets[size]
+            ])
+            targets = remap[np.concatenate(pieces)]
+            base_degree = old.outdegree[origin]
+            base_offsets = np.concatenate(([0], np.cumsum(base_degree)))
+
+            # links to removed pages are dropped
+            kept = targets >= 0
+            dropped = np.flatnonzero(~kept)
+            kept_degree = base_degree - np.bincount(
+                np.searchsorted(base_offsets, dropped, side="right") - 1,
+                minlength=size
+            )
+        else:
+            origin = remap
+            base_offsets = old.link_offsets
+            targets = old.link_targets
+            kept = np.ones(len(targets), dtype=bool)
+            kept_degree = old.outdegree.copy()
+        remaining = len(pages)
+        index.update(zip(added, range(remaining, remaining + len(added))))
+        pages.extend(added)
+        n = len(pages)
+        origin = np.concatenate((origin, np.full(len(added), -1)))
+
+        def pairs(links):
+            links = [
+                (index[source], index[target]) for source, target in links
+                if source in index and target in index and source != target
+            ]
+            return np.array(links, dtype=np.int64).reshape(-1, 2)
+
+        def old_links(page):
+            # positions of the old links of a page, or an empty range
+            if page >= remaining:
+                return slice(0, 0)
+            return slice(base_offsets[page], base_offsets[page + 1])
+
+        # only the links of the pages named by a change are looked at
+        for source, target in pairs(remove_links).tolist():
+            links = old_links(source)
+            dropped = kept[links] & (targets[links] == target)
+            if dropped.any():
+                kept[links] &= ~dropped
+                kept_degree[source] -= 1
+
+        added_links = []
+        for source, target in dict.fromkeys(map(tuple, pairs(add_links).tolist())):
+            links = old_links(source)
+            if not np.any(kept[links] & (targets[links] == target)):
+                added_links.append((source, target))
+        added_links = np.array(added_links, dtype=np.int64).reshape(-1, 2)
+        added_links = added_links[np.argsort(added_links[:, 0], kind="stable")]
+
+        # links kept by each page, then the added links inserted at the end
+        # of their source's links: one pass over the link array, no sort
+        degree = np.zeros(n, dtype=np.int64)
+        degree[:remaining] = kept_degree
+        offsets = np.concatenate(([0], np.cumsum(degree)))
+        link_targets = np.insert(
+            targets[kept] if not kept.all() else targets,
+            offsets[added_links[:, 0] + 1], added_links[:, 1]
+        )
+        degree += np.bincount(added_links[:, 0], minlength=n)
+        offsets = np.concatenate(([0], np.cumsum(degree)))
+        graph = LinkGraph.from_links(pages, offsets, link_targets, index)
+
+        # carry scores and residuals over; new pages start with no score,
+        # so their residual is the random surf (1 - d)
+        scores = np.zeros(n)
+        residuals = np.full(n, 1 - d)
+        scores[:remaining] = self.scores[origin[:remaining]]
+        residuals[:remaining] = self.residuals[origin[:remaining]]
+        touched = set(range(remaining, n))
+
+        def move(old_page, weight):
+            # takes the score pushed by an old page out of its old links
+            if not old.outdegree[old_page]:
+                return
+            links = remap[old.link_targets[
+                old.link_offsets[old_page]:old.link_offsets[old_page + 1]
+            ]]
+            links = links[links >= 0]
+            residuals[links] -= d * weight / old.outdegree[old_page]
+            touched.update(links.tolist())
+
+        # removed pages no longer push their score to the pages they linked to
+        for old_page in np.flatnonzero(remap < 0).tolist():
+            move(old_page, self.scores[old_page])
+
+        # remaining pages whose links changed push their score to other pages
+        candidates = set(np.flatnonzero(
+            kept_degree != old.outdegree[origin[:remaining]]
+        ).tolist())
+        candidates.update(added_links[:, 0].tolist())
+        for page in candidates:
+            links = graph.link_targets[
+                graph.link_offsets[page]:graph.link_offsets[page + 1]
+            ]
+            old_page = origin[page]
+            if old_page >= 0:
+                previous = remap[old.link_targets[
+                    old.link_offsets[old_page]:old.link_offsets[old_page + 1]
+                ]]
+                if np.array_equal(np.sort(previous), np.sort(links)):
+                    continue
+                move(old_page, scores[page])
+            if len(links):
+                residuals[links] += d * scores[page] / len(links)
+                touched.update(links.tolist())
+
+        pushes, followed = self.push(graph, scores, residuals, touched)
+        self.graph, self.scores, self.residuals = graph, scores, residuals
+
+        report = {
+            "pushes": pushes,
+            "iterations": float(followed / max(len(graph.link_targets), 1)),
+            "seconds": time.perf_counter() - start
+        }
+
+        if compare:
+            start = time.perf_counter()
+            ranks, iterations = power_iteration(graph, d, self.tolerance)
+            report["cold_seconds"] = time.perf_counter() - start
+            report["cold_iterations"] = iterations
+            report["difference"] = float(np.abs(
+                ranks - self.scores / self.scores.sum()
+            ).max())
+
+        return report
+
+    def push(self, graph, scores, residuals, touched):
+        """
+        Moves residuals into scores, starting from the `touched` pages,
+        until every residual is within the tolerance, scaled from ranks
+        (which add up to 1) to scores.
+
+        Every page above the tolerance is pushed at once, in rounds, so
+        that each round is a few NumPy operations over the links of the
+        pushed pages only, or a single product with the link matrix once
+        rounds reach a large part of the corpus.
+
+        Returns the number of pushes and of links followed.
+        """
+        d = self.damping_factor
+        # within the L1 tolerance of a cold run once ranks are normalized
+        threshold = self.tolerance * scores.sum() / len(scores)
+        active = np.array(sorted(touched), dtype=np.int64)
+        active = active[np.abs(residuals[active]) > threshold]
+
+        pushes = followed = 0
+        while len(active):
+            pushed = residuals[active]
+            scores[active] += pushed
+            residuals[active] = 0
+            pushes += len(active)
+
+            # the score pushed by a page with no links is spread over every
+            # page, which only rescales PageRank
+            if len(active) > DENSE * len(graph):
+                spread = np.zeros(len(graph))
+                spread[active] = pushed
+                residuals += d * (graph.matrix @ spread)
+                followed += len(graph.link_targets)
+                active = np.flatnonzero(np.abs(residuals) > threshold)
+                continue
+
+            links, degree = graph.gather(active)
+            linked = degree > 0
+            followed += len(links)
+            np.add.at(residuals, links, np.repeat(
+                d * pushed[linked] / degree[linked], degree[linked]
+            ))
+
+            # pages linked to by several pushed pages are pushed only once
+            links.sort()
+            links = links[np.diff(links, prepend=-1) != 0]
+            active = links[np.abs(residuals[links]) > threshold]
+
+        return pushes, followed
+
+
+if __name__ == "__main__":
+    main()
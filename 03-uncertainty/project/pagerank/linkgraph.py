@@ -0,0 +1,225 @@
+import random
+
+import numpy as np
+from scipy import sparse
+
+
+class LinkGraph():
+    """
+    Corpus of pages represented as a sparse link matrix.
+
+    Pages are numbered 0..N-1 and `matrix[p, i]` is the probability of
+    following a link from page i to page p, i.e. 1 / (number of links of i).
+    Pages without links (dangling pages) have an empty column: they are
+    handled analytically by spreading their rank over every page.
+    """
+
+    def __init__(self, pages, sources, targets):
+        """
+        Builds the graph of `pages` (a list of names) from arrays of
+        page numbers such that page sources[k] links to page targets[k].
+        """
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+
+        n = len(self.pages)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+
+        self.outdegree = np.bincount(sources, minlength=n)
+        self.dangling = self.outdegree == 0
+
+        weights = 1 / self.outdegree[sources]
+        self.matrix = sparse.csr_matrix(
+            (weights, (targets, sources)), shape=(n, n)
+        )
+
+        # links of page i are link_targets[link_offsets[i]:link_offsets[i + 1]],
+        # so that a link can be drawn uniformly in O(1)
+        self.link_targets = targets[np.argsort(sources, kind="stable")]
+        self.link_offsets = np.concatenate(([0], np.cumsum(self.outdegree)))
+
+    @classmethod
+    def from_links(cls, pages, link_offsets, link_targets, index=None):
+        """
+        Builds the graph of `pages` directly from the links of every page,
+        laid out like `link_offsets` and `link_targets`, reusing `index` if
+        given instead of numbering the pages again.
+
+        Nothing is sorted: the matrix is stored in CSC form over the same
+        arrays (column i holds the links of page i), so this is O(N + links).
+        """
+        graph = cls.__new__(cls)
+        graph.pages = pages if isinstance(pages, list) else list(pages)
+        graph.index = index if index is not None else {
+            page: i for i, page in enumerate(graph.pages)
+        }
+
+        n = len(graph.pages)
+        graph.link_offsets = np.asarray(link_offsets, dtype=np.int64)
+        graph.link_targets = np.asarray(link_targets, dtype=np.int64)
+        graph.outdegree = np.diff(graph.link_offsets)
+        graph.dangling = graph.outdegree == 0
+
+        weights = np.repeat(1 / np.maximum(graph.outdegree, 1), graph.outdegree)
+        graph.matrix = sparse.csc_matrix(
+            (weights, graph.link_targets, graph.link_offsets), shape=(n, n)
+        )
+        return graph
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds the graph of a corpus dictionary mapping a page name
+        to the set of pages it links to.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            i = index[page]
+            for link in corpus[page]:
+                sources.append(i)
+                targets.append(index[link])
+        return cls(pages, sources, targets)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a graph written by `save`.
+        """
+        with np.load(path) as data:
+            pages = data["pages"].tolist()
+            outdegree = np.diff(data["offsets"])
+            sources = np.repeat(np.arange(len(pages)), outdegree)
+            return cls(pages, sources, data["targets"])
+
+    def save(self, path):
+        """
+        Writes the graph to `path` in NumPy's .npz format: the page names,
+        and the links of every page as integer arrays (an edge list sorted
+        by source, with the offset of each source's links).
+        """
+        dtype = np.int32 if len(self) < 2 ** 31 else np.int64
+        np.savez(
+            path,
+            pages=np.array(self.pages, dtype=str),
+            offsets=self.link_offsets.astype(np.int64),
+            targets=self.link_targets.astype(dtype)
+        )
+
+    def __len__(self):
+        return len(self.pages)
+
+    def gather(self, pages):
+        """
+        Returns the links of every page of the array `pages`, concatenated,
+        along with the number of links of each page.
+        """
+        degree = self.outdegree[pages]
+        total = int(degree.sum())
+        # k-th link overall is link (k - links of the previous pages) of its page
+        starts = self.link_offsets[pages] - np.cumsum(degree) + degree
+        positions = np.repeat(starts, degree) + np.arange(total)
+        return self.link_targets[positions], degree
+
+    def to_dict(self, ranks):
+        """
+        Returns a dictionary mapping each page name to its value in `ranks`.
+        """
+        return {page: float(rank) for page, rank in zip(self.pages, ranks)}
+
+
+def power_iteration(graph, damping_factor, tolerance=1e-6,
+                    max_iterations=1000, ranks=None):
+    """
+    Computes PageRank by repeatedly applying
+
+        PR = (1 - d) / N + d * (M PR + sum(PR of dangling pages) / N)
+
+    until the L1 change between two iterations is below `tolerance`.
+    `ranks` is the starting vector, the uniform distribution by default.
+
+    Returns the rank vector and the number of iterations performed.
+    """
+    n = len(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+
+    random_surf = (1 - damping_factor) / n
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        # a page with no links is interpreted as linking to every page
+        dangling_surf = ranks[graph.dangling].sum() / n
+        updated = random_surf + damping_factor * (
+            graph.matrix @ ranks + dangling_surf
+        )
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if change < tolerance:
+            break
+
+    return ranks, iterations
+
+
+def sample_walk(graph, damping_factor, n, rng=random):
+    """
+    Estimates PageRank by following a single random surfer for `n` steps,
+    starting with a page at random.
+
+    The next page is a mixture of two uniform choices: with probability
+    `damping_factor` a link of the current page, otherwise any page. Each
+    step is therefore O(1), with no distribution over all pages built.
+
+    Returns the vector of the fraction of samples spent on each page.
+    """
+    pages = len(graph)
+    outdegree = graph.outdegree.tolist()
+    offsets = graph.link_offsets.tolist()
+    targets = graph.link_targets.tolist()
+    counts = [0] * pages
+
+    page = rng.randrange(pages)
+    for _ in range(n):
+        degree = outdegree[page]
+        # a page with no links is interpreted as linking to every page
+        if degree and rng.random() < damping_factor:
+            page = targets[offsets[page] + rng.randrange(degree)]
+        else:
+            page = rng.randrange(pages)
+        counts[page] += 1
+
+    return np.array(counts) / n
+
+
+def sample_walks(graph, damping_factor, n, surfers=1000, seed=None):
+    """
+    Estimates PageRank by advancing `surfers` independent random surfers
+    at once, with NumPy, until `n` samples have been drawn.
+
+    Returns the vector of the fraction of samples spent on each page.
+    """
+    rng = np.random.default_rng(seed)
+    pages = len(graph)
+    counts = np.zeros(pages, dtype=np.int64)
+
+    positions = rng.integers(pages, size=surfers)
+    drawn = 0
+    while drawn < n:
+        size = min(surfers, n - drawn)
+        positions = positions[:size]
+
+        follow = (rng.random(size) < damping_factor) & ~graph.dangling[positions]
+        current = positions[follow]
+        links = graph.link_offsets[current] + rng.integers(
+            graph.outdegree[current]
+        )
+
+        positions = rng.integers(pages, size=size)
+        positions[follow] = graph.link_targets[links]
+
+        counts += np.bincount(positions, minlength=pages)
+        drawn += size
+
+    return counts / n
@@ -1,10 +1,12 @@
 import os
-import random
 import re
 import sys
 
+from linkgraph import LinkGraph, power_iteration, sample_walk, sample_walks
+
 DAMPING = 0.85
 SAMPLES = 200000
+TOLERANCE = 1e-6
 
 
 def main():
@@ -82,7 +84,7 @@ def transition_model(corpus, page, damping_factor):
     # corpus[page] are the pages I have 
     return pages
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, surfers=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -91,36 +93,20 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
 
-    Random Surfer Model
+    Random Surfer Model: by default a single surfer visits the `n` pages,
+    each step drawing either a link of the current page or any page in
+    O(1). If `surfers` is given, that many independent surfers are
+    advanced at once with NumPy, which is much faster for large `n`.
     """
-    all_pages = list(corpus.keys())
-
-    # create a dictionary to store results
-    pages = {}
-    for k in all_pages:
-        pages[k] = 0
-
-    # select randomly from the set of pages
-    page = random.choice(all_pages)
-    for _ in range(n):
-        tm = transition_model(
-            corpus=corpus, 
-            page=page, 
-            damping_factor=damping_factor
-        )
-        # get 1 sample for the next page given the pages probabilities
-        page = random.choices(
-            population=all_pages, 
-            weights=[tm[p] for p in all_pages], 
-            k=1
-        )[0]
-        
-        pages[page] += 1/n
-
-    return pages
+    graph = LinkGraph.from_corpus(corpus)
+    if surfers is None:
+        ranks = sample_walk(graph, damping_factor, n)
+    else:
+        ranks = sample_walks(graph, damping_factor, n, surfers)
+    return graph.to_dict(ranks)
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -128,81 +114,17 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    The link matrix is built once as a sparse matrix and PageRank is
+    updated with vector operations until the L1 change between two
+    iterations is below `tolerance`. Pages with no links are interpreted
+    as having one link for every page in the corpus (including itself),
+    without modifying `corpus`.
     """
-    eps = 1e-3
-    counter = 0
-    all_pages = list(corpus.keys())
-    N = len(all_pages)
-    # create a dictionary to store results
-    # pages will be the initial pagerank (prev)
-    pagerank_storage = {}
-    # pagerank will be the resulting pagerank after an iteration (after)
-    pagerank = {}
-    for k in all_pages:
-        pagerank_storage[k] = 1 / N
-        pagerank[k] = 1 / N
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, damping_factor, tolerance)
+    return graph.to_dict(ranks)
 
-    # with probability 1 - d, the surfer chose a page at random 
-    # and ended up on page p.
-    random_surf = (1 - damping_factor) / N
-    
-    converged = False
-    while not converged:
-        for p in all_pages:
-            # A page that has no links at all should be interpreted 
-            # as having one link for every page in the corpus (including itself).
-            if corpus[p] == set():
-                corpus[p] = set(all_pages)
-
-            # we need to loop through all the pages that links to p
-            links_to_p = set()
-            for l in all_pages:
-                if p in corpus[l]:
-                    links_to_p.add(l)
-    
-            link_surf = 0
-            # with probability d, the surfer followed a link from 
-            # a page i to page p.
-            for i in links_to_p:
-                # domain size is the number of links present in page i
-                domain_size = len(corpus[i])
-                
-                # pagerank[i] represents the probability that we are
-                # on page i and surf to p
-                
-                # divide by the number of pages in page i (because from there,
-                # you could move to every page with the same probability)
-                link_surf += damping_factor * pagerank[i] / domain_size
-
-                # note that using pagerank (instead of previous pagerank value 
-                # stored in pagerank_storage) increases the convergence rate.
-
-            pagerank[p] = random_surf + link_surf
-
-        if convergence_criterion(pagerank_storage, pagerank, eps, 'Linf'):
-            converged = True
-
-        counter += 1
-        pagerank_storage = pagerank.copy()
-    return pagerank
-
-
-def convergence_criterion(prev, after, eps, norm='L2'):
-    if norm not in ('L1','L2','Linf'):
-        raise NotImplementedError('Convergence criteria not implemented yet.')
-    
-    if norm == 'L1':
-        # L1 norm is the mean-absolute-error
-        if sum([abs(prev[p] - after[p]) for p in prev.keys()]) < eps:
-            return True
-    if norm == 'L2':
-        if sum(([(prev[p] - after[p])**2 for p in prev.keys()]))**1/2 < eps:
-            return True
-    if norm == 'Linf':
-        if max([abs(prev[p] - after[p]) for p in prev.keys()]) < eps:
-            return True
-
-    return False
 
 if __name__ == "__main__":
     main()
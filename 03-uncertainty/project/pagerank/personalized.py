@@ -0,0 +1,122 @@
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from linkgraph import LinkGraph
+
+DAMPING = 0.85
+
+# Residual per link left unpushed, which bounds the error of each estimate
+EPSILON = 1e-7
+
+# Seed sets whose results are kept
+CACHE_SIZE = 1024
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py graph.npz page [page ...]")
+
+    graph = LinkGraph.load(sys.argv[1])
+    pagerank = PersonalizedPageRank(graph, DAMPING)
+    ranks = pagerank.query(sys.argv[2:])
+
+    print(f"Personalized PageRank Results for {', '.join(sys.argv[2:])}")
+    for page in sorted(ranks, key=ranks.get, reverse=True)[:10]:
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+class PersonalizedPageRank():
+    """
+    PageRank where the random surf (and pages with no links) always
+    jumps back to a set of seed pages rather than to any page.
+
+    Results are computed with forward push: the probability mass still
+    to be distributed (the residual) starts on the seeds and is pushed
+    along links, a fraction 1 - d being kept by each page it goes through,
+    until no page holds more than EPSILON residual per link. Only the
+    neighbourhood of the seeds is explored, so queries do not depend
+    on the size of the corpus: the per-page thresholds are computed once,
+    and the scratch arrays are allocated once and cleared, after each
+    query, at the pages it reached only. The results of the last
+    `cache_size` seed sets are cached.
+    """
+
+    def __init__(self, graph, damping_factor, epsilon=EPSILON,
+                 cache_size=CACHE_SIZE):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.epsilon = epsilon
+        self.thresholds = epsilon * np.maximum(graph.outdegree, 1)
+        self.estimates = np.zeros(len(graph))
+        self.residuals = np.zeros(len(graph))
+        self.push = lru_cache(maxsize=cache_size)(self.push)
+
+    def query(self, seeds):
+        """
+        Returns a dictionary mapping each page reached from `seeds`
+        (page names) to its personalized PageRank.
+        """
+        seeds = frozenset(self.graph.index[page] for page in seeds)
+        if not seeds:
+            raise ValueError("Personalized PageRank needs at least one seed page")
+
+        pages, ranks = self.push(seeds)
+        return {
+            self.graph.pages[page]: rank
+            for page, rank in zip(pages.tolist(), ranks.tolist())
+        }
+
+    def push(self, seeds):
+        """
+        Runs forward push from the frozenset of page numbers `seeds`.
+
+        Returns the arrays of the pages reached and of their estimates.
+        """
+        graph = self.graph
+        d = self.damping_factor
+        seeds = np.array(sorted(seeds), dtype=np.int64)
+        estimates, residuals = self.estimates, self.residuals
+        thresholds = self.thresholds
+
+        residuals[seeds] = 1 / len(seeds)
+        reached = [seeds]
+        try:
+            active = seeds
+            while len(active):
+                pushed = residuals[active]
+                residuals[active] = 0
+                estimates[active] += (1 - d) * pushed
+
+                links, degree = graph.gather(active)
+                linked = degree > 0
+                np.add.at(residuals, links, np.repeat(
+                    d * pushed[linked] / degree[linked], degree[linked]
+                ))
+
+                # pages with no links jump back to the seeds
+                candidates = links
+                lost = d * pushed[~linked].sum()
+                if lost:
+                    residuals[seeds] += lost / len(seeds)
+                    candidates = np.concatenate((links, seeds))
+
+                # pages linked to by several pushed pages are pushed only once
+                candidates.sort()
+                candidates = candidates[np.diff(candidates, prepend=-1) != 0]
+                reached.append(candidates)
+                active = candidates[residuals[candidates] > thresholds[candidates]]
+
+            pages = np.unique(np.concatenate(reached))
+            pages = pages[estimates[pages] > 0]
+            return pages, estimates[pages]
+        finally:
+            # leave the scratch arrays zeroed for the next query
+            touched = np.concatenate(reached)
+            estimates[touched] = 0
+            residuals[touched] = 0
+
+
+if __name__ == "__main__":
+    main()
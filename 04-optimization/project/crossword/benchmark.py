@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import time
+
+from crossword import Crossword
+
+# Widths of the square grids to benchmark
+SIZES = [21, 41, 61]
+
+# Repetitions of each measurement, of which the fastest is kept
+REPEAT = 5
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    for size in sizes:
+        filename = lattice_file(size)
+        crossword = Crossword(filename, os.devnull)
+        variables = crossword.variables
+
+        # the sweep is timed with the rest of Crossword's construction
+        before = fastest(lambda: scan_overlaps(variables))
+        after = fastest(lambda: Crossword(filename, os.devnull))
+        overlaps = scan_overlaps(variables)
+        lookups_before = fastest(lambda: [
+            scan_neighbors(variables, overlaps, var) for var in variables
+        ])
+        lookups_after = fastest(lambda: [
+            crossword.neighbors(var) for var in variables
+        ])
+
+        # both must agree
+        for var in variables:
+            if set(crossword.neighbors(var)) != scan_neighbors(
+                variables, overlaps, var
+            ):
+                raise AssertionError(f"Neighbors of {var} differ")
+        for (v1, v2), overlap in overlaps.items():
+            if crossword.overlaps[v1, v2] != overlap:
+                raise AssertionError(f"Overlap of {v1} and {v2} differs")
+
+        print(f"{size}x{size} grid: {len(variables)} slots")
+        print(f"  Overlaps: {before * 1000:.2f}ms before, "
+              f"{after * 1000:.2f}ms after, whole Crossword included "
+              f"({before / after:.1f}x)")
+        print(f"  Neighbors of every slot: {lookups_before * 1000:.2f}ms "
+              f"before, {lookups_after * 1000:.3f}ms after "
+              f"({lookups_before / lookups_after:.0f}x)")
+
+
+def lattice_file(size):
+    """
+    Write the structure of a `size` x `size` lattice of slots crossing
+    every other cell, broken up by blocked crossings, to a temporary file
+    and return its name.
+    """
+    rows = []
+    for i in range(size):
+        row = ""
+        for j in range(size):
+            blocked = (i % 2 and j % 2) or (
+                not i % 2 and not j % 2 and (i // 2 + j // 2) % 4 == 3
+            )
+            row += "#" if blocked else "_"
+        rows.append(row)
+
+    filename = os.path.join(tempfile.gettempdir(), f"lattice{size}.txt")
+    with open(filename, "w") as f:
+        f.write("\n".join(rows))
+    return filename
+
+
+def fastest(function):
+    """
+    Return the fastest time, in seconds, of REPEAT calls of `function`.
+    """
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def scan_overlaps(variables):
+    """
+    Return overlaps the way Crossword computed them before the sweep:
+    intersecting the cells of every pair of variables.
+    """
+    overlaps = dict()
+    for v1 in variables:
+        for v2 in variables:
+            if v1 == v2:
+                continue
+            cells1 = v1.cells
+            cells2 = v2.cells
+            intersection = set(cells1).intersection(cells2)
+            if not intersection:
+                overlaps[v1, v2] = None
+            else:
+                intersection = intersection.pop()
+                overlaps[v1, v2] = (
+                    cells1.index(intersection),
+                    cells2.index(intersection)
+                )
+    return overlaps
+
+
+def scan_neighbors(variables, overlaps, var):
+    """
+    Return neighbors the way Crossword.neighbors did before the sweep:
+    scanning every variable.
+    """
+    return set(
+        v for v in variables
+        if v != var and overlaps[v, var]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,16 @@ class Crossword():
         with open(words_file) as f:
             self.words = set(f.read().upper().splitlines())
 
+        # Bucket vocabulary by length, once: variables' domains are sets of
+        # positions in the tuple of words of their length
+        buckets = dict()
+        for word in self.words:
+            buckets.setdefault(len(word), []).append(word)
+        self.words_by_length = {
+            length: tuple(sorted(words))
+            for length, words in buckets.items()
+        }
+
         # Determine variable set
         self.variables = set()
         for i in range(self.height):
@@ -108,26 +118,39 @@ class Crossword():
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Found in one sweep, grouping the variables crossing each cell
+        crossings = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                crossings.setdefault(cell, []).append((var, k))
+
+        self.overlaps = Overlaps()
+        adjacency = {var: [] for var in self.variables}
+        for crossing in crossings.values():
+            for v1, k1 in crossing:
+                for v2, k2 in crossing:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+                        adjacency[v1].append(v2)
+
+        # Overlapping variables of each variable, in a fixed order
+        self.adjacency = {
+            var: tuple(sorted(
+                neighbors, key=lambda v: (v.i, v.j, v.direction)
+            ))
+            for var, neighbors in adjacency.items()
+        }
 
     def neighbors(self, var):
-        """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        """Given a variable, return tuple of overlapping variables."""
+        return self.adjacency[var]
+
+
+class Overlaps(dict):
+    """
+    Overlaps of pairs of variables which do overlap; any other pair of
+    variables is looked up as None.
+    """
+
+    def __missing__(self, key):
+        return None
@@ -0,0 +1,119 @@
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from crossword import Crossword
+from generate import CrosswordCreator
+
+# Time budget, in seconds, when none is given
+SECONDS = 60
+
+# Assignments tried by one randomized search before it is restarted
+# with another seed
+NODE_LIMIT = 1000
+
+# Searches queued per worker process, so that none sits idle
+QUEUED = 2
+
+# Creator of the worker process, loaded once by `load`
+creator = None
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python fills.py structure words count [seconds]")
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    count = int(sys.argv[3])
+    seconds = float(sys.argv[4]) if len(sys.argv) == 5 else SECONDS
+
+    # Print each fill as soon as it is found
+    printer = CrosswordCreator(Crossword(structure, words))
+    found = 0
+    start = time.perf_counter()
+    for assignment in fills(structure, words, count, seconds):
+        found += 1
+        print(f"Fill {found} ({time.perf_counter() - start:.2f}s):")
+        printer.print(assignment)
+        print()
+    print(f"{found} distinct fills in {time.perf_counter() - start:.2f}s")
+
+
+def fills(structure, words, count=None, seconds=SECONDS, workers=None,
+          node_limit=NODE_LIMIT):
+    """
+    Yield distinct fills of `structure` with the vocabulary in `words`, as
+    assignments, as soon as they are found.
+
+    Independent randomized searches, each with its own seed and giving up
+    after `node_limit` assignments, run in parallel over `workers`
+    processes, and are restarted with new seeds until `count` distinct
+    fills are found (or forever, if `count` is None) or `seconds` have
+    passed.
+    """
+    deadline = time.monotonic() + seconds
+    workers = workers or os.cpu_count()
+    seeds = itertools.count()
+    seen = set()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=load, initargs=(structure, words)
+    ) as executor:
+        pending = {
+            executor.submit(sample, seed, node_limit)
+            for seed in itertools.islice(seeds, workers * QUEUED)
+        }
+        try:
+            while count is None or len(seen) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                done, pending = wait(
+                    pending, timeout=remaining, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    assignment = future.result()
+                    pending.add(executor.submit(sample, next(seeds), node_limit))
+                    if assignment is None:
+                        continue
+
+                    key = frozenset(assignment.items())
+                    if key not in seen:
+                        seen.add(key)
+                        yield assignment
+                        if count is not None and len(seen) >= count:
+                            return
+        finally:
+            # searches still running are bounded by the node limit
+            for future in pending:
+                future.cancel()
+
+
+def load(structure, words):
+    """
+    Load the crossword of a worker process.
+    """
+    global creator
+    creator = CrosswordCreator(Crossword(structure, words))
+
+
+def sample(seed, node_limit):
+    """
+    Search for a fill with value ordering randomized by `seed`, giving up
+    after `node_limit` assignments. Return the fill, or None.
+    """
+    creator.random = random.Random(seed)
+    creator.node_limit = node_limit
+    assignment = creator.solve()
+    return dict(assignment) if assignment is not None else None
+
+
+if __name__ == "__main__":
+    main()
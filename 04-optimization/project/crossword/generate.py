@@ -1,3 +1,4 @@
+import random
 import sys
 
 from crossword import *
@@ -5,16 +6,90 @@ from crossword import *
 
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    def __init__(self, crossword, inference="mac", seed=None, node_limit=None):
         """
         Create new CSP crossword generate.
+
+        `inference` is run after each assignment during the search:
+        "mac" (maintain arc consistency), "forward" (forward checking)
+        or None.
+
+        If `seed` is given, values that rule out as many others are tried
+        in random order, so that different seeds find different solutions.
+        If `node_limit` is given, the search gives up (returning None) after
+        trying that many assignments, so that it can be restarted.
         """
+        if inference not in ("mac", "forward", None):
+            raise ValueError(f"Unknown inference: {inference}")
         self.crossword = crossword
+        self.inference = inference
+        self.random = random.Random(seed) if seed is not None else None
+        self.node_limit = node_limit
+
+        # Each domain is a bitset (an int) over the words of the variable's
+        # length in `crossword.words_by_length`, shared by all variables:
+        # bit k is set if the kth word is in the domain
+        self.index = {
+            word: k
+            for words in self.crossword.words_by_length.values()
+            for k, word in enumerate(words)
+        }
+        self.domains = dict()
+        self.reset()
+
+        # Bitsets of the words of a given length with a given letter at a
+        # given position, for each position overlapping another variable:
+        # maps (length, position) to a dict from letter to bitset
+        self.letters = dict()
+        for (x, y), overlap in self.crossword.overlaps.items():
+            if overlap is not None and (x.length, overlap[0]) not in self.letters:
+                self.letters[x.length, overlap[0]] = letter_bitsets(
+                    self.vocabulary(x), overlap[0]
+                )
+
+    def reset(self):
+        """
+        Put every word back into every domain and clear the search state,
+        so that the CSP can be solved again.
+        """
         self.domains = {
-            var: self.crossword.words.copy()
+            var: (1 << len(self.vocabulary(var))) - 1
             for var in self.crossword.variables
         }
 
+        # Words assigned during search, so that uniqueness is a lookup
+        self.used = set()
+
+        # Domains before they were reduced, as (variable, domain) pairs in
+        # order of reduction, so that the search can put them back when it
+        # backtracks
+        self.trail = []
+
+        # Search statistics: assignments tried, and assignments undone
+        self.nodes = 0
+        self.backtracks = 0
+
+    def vocabulary(self, var):
+        """
+        Return the tuple of words of the length of `var`, which the bits of
+        its domain refer to.
+        """
+        return self.crossword.words_by_length.get(var.length, ())
+
+    def values(self, var):
+        """
+        Return the list of words in the domain of `var`.
+        """
+        words = self.vocabulary(var)
+        bits = f"{self.domains[var]:b}"[::-1]
+        return [words[k] for k, bit in enumerate(bits) if bit == "1"]
+
+    def size(self, var):
+        """
+        Return the number of words in the domain of `var`.
+        """
+        return self.domains[var].bit_count()
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -89,10 +164,26 @@ class CrosswordCreator():
         """
         Enforce node and arc consistency, and then solve the CSP.
         """
+        self.reset()
         self.enforce_node_consistency()
-        self.ac3()
+        if not self.ac3():
+            return None
+        self.trail = []
         return self.backtrack(dict())
 
+    def solutions(self):
+        """
+        Enforce node and arc consistency, and then yield every solution of
+        the CSP (up to `node_limit` assignments tried), each as a new dict.
+        """
+        self.reset()
+        self.enforce_node_consistency()
+        if not self.ac3():
+            return
+        self.trail = []
+        for assignment in self.search(dict()):
+            yield dict(assignment)
+
     def enforce_node_consistency(self):
         """
         Update `self.domains` such that each variable is node-consistent,
@@ -102,16 +193,66 @@ class CrosswordCreator():
         Remove any values that are inconsistent with a variable's unary
         constraints; in this case, the length of the word.
         """
-        # Apply unary constraint 
-        variables = self.domains.keys()
-        for var in variables:
-            domain = self.domains[var].copy()
-            for word in self.domains[var]:
-                if len(word) != var.length:
-                    domain.discard(word)
-            # overwrite domain
+        # domains only range over words of the variable's length, so
+        # keeping every one of them applies the unary constraint
+        for var in self.domains:
+            self.domains[var] &= (1 << len(self.vocabulary(var))) - 1
+
+    def restrict(self, var, domain):
+        """
+        Reduce the domain of `var` to the bitset `domain`, recording the
+        previous domain on the trail.
+        """
+        self.trail.append((var, self.domains[var]))
+        self.domains[var] = domain
+
+    def undo(self, mark):
+        """
+        Restore every domain reduced since the trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            var, domain = self.trail.pop()
             self.domains[var] = domain
 
+    def infer(self, var, assignment):
+        """
+        Reduce the domains of unassigned variables after `var` is assigned
+        `assignment[var]`, by forward checking or maintaining arc
+        consistency, depending on `self.inference`.
+
+        Return False if a domain ends up empty; return True otherwise.
+        """
+        value = assignment[var]
+        bit = 1 << self.index[value]
+        self.restrict(var, bit)
+        if self.inference is None:
+            return True
+
+        # no other variable can be assigned the same word
+        arcs = []
+        for other in self.domains:
+            if (other not in assignment and other.length == var.length
+                    and self.domains[other] & bit):
+                self.restrict(other, self.domains[other] & ~bit)
+                if not self.domains[other]:
+                    return False
+                arcs.extend(
+                    (vn, other) for vn in self.crossword.neighbors(other)
+                )
+
+        if self.inference == "forward":
+            for neighbor in self.crossword.neighbors(var):
+                if neighbor not in assignment:
+                    self.revise(neighbor, var)
+                    if not self.domains[neighbor]:
+                        return False
+            return True
+
+        arcs.extend(
+            (neighbor, var) for neighbor in self.crossword.neighbors(var)
+        )
+        return self.ac3(arcs) if arcs else True
+
     def revise(self, x, y):
         """
         Make variable `x` arc consistent with variable `y`.
@@ -127,31 +268,27 @@ class CrosswordCreator():
             return False
 
         n1, n2 = self.crossword.overlaps[x,y]
-        
-        domain = self.domains[x].copy()
-        
-        for d1 in self.domains[x]:
-            # initialize acceptable flag to latter remove unacceptable domains from x
-            fl_acceptable = False
-
-            for d2 in self.domains[y]:
-                # equal words are not acceptable
-                if d1 == d2:
-                    continue
-                
-                if d1[n1] == d2[n2]:
-                    fl_acceptable = True
-                    break
-                
-            # if all of them are unnacceptable, remove from x's domain:
-            if not fl_acceptable:
-                domain.discard(d1)
-        
-        if self.domains[x] == domain:
-            return False
-        else:
-            self.domains[x] = domain
 
+        # words of x whose letter some word of y has at the overlap, a few
+        # bitset operations per letter instead of a scan of y's domain
+        same_length = x.length == y.length
+        allowed = 0
+        x_letters = self.letters[x.length, n1]
+        for letter, words in self.letters[y.length, n2].items():
+            support = self.domains[y] & words
+            if not support or letter not in x_letters:
+                continue
+            if same_length and not support & (support - 1):
+                # a single word does not support itself, as both variables
+                # can't be assigned the same word
+                allowed |= x_letters[letter] & ~support
+            else:
+                allowed |= x_letters[letter]
+
+        domain = self.domains[x] & allowed
+        if domain == self.domains[x]:
+            return False
+        self.restrict(x, domain)
         return True
 
     def ac3(self, arcs=None):
@@ -164,17 +301,14 @@ class CrosswordCreator():
         return False if one or more domains end up empty.
         """
         if not arcs:
-            # consider all arcs in the problem
-            variables = self.domains.keys()
-            arcs = []
-            for v1 in variables:
-                for v2 in variables:
-                    if v1 == v2:
-                        continue
-                    arc = (v1, v2)
-                    arcs.append(arc)
+            # consider all arcs between overlapping variables
+            arcs = [
+                (v1, v2)
+                for v1 in self.domains
+                for v2 in self.crossword.neighbors(v1)
+            ]
         else:
-            pass
+            arcs = list(arcs)
 
         while len(arcs) > 0:
             v1, v2 = arcs.pop()
@@ -183,11 +317,12 @@ class CrosswordCreator():
                 if not self.domains[v1]:
                     # there's no way to solve this problem
                     return False
-                for vn in (self.crossword.neighbors(v1) - {v2}):
+                for vn in self.crossword.neighbors(v1):
                     # if we've modified v1's domain, there might 
                     # be some other (vn, v1) that was arc-consistent, but 
                     # now is not anymore. 
-                    arcs.append((vn, v1))
+                    if vn != v2:
+                        arcs.append((vn, v1))
 
 
         return True
@@ -197,49 +332,37 @@ class CrosswordCreator():
         Return True if `assignment` is complete (i.e., assigns a value to each
         crossword variable); return False otherwise.
         """
-        self.consistent(assignment)
-        variables = set(self.domains.keys())
-        for var in variables:
-            if var not in assignment.keys():
-                return False
-
-            if not assignment.get(var):
-                return False
-        
-        return True
+        return len(assignment) == len(self.domains)
 
-    def consistent(self, assignment):
+    def consistent(self, assignment, var=None):
         """
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
+
+        If `var` is given, the rest of `assignment` is taken to be consistent
+        already, with its words in `self.used`, and only `var` is checked.
         """
-        words = []
-        variables = set(assignment.keys())
-        
+        if var is None:
+            variables = list(assignment)
+            if len(set(assignment.values())) != len(variables):
+                return False
+        else:
+            variables = [var]
+            if assignment[var] in self.used:
+                return False
+
         for v1 in variables:
-            
-            assigned_word = assignment.get(v1, '')
+            word = assignment[v1]
             # if the size differs from expected, not consistent
-            if not len(assigned_word) == v1.length:
+            if len(word) != v1.length:
                 return False
-            
-            # append to check whether they have same values afterwards
-            words.append(assigned_word)
-
-            # if conflicting characters, not consistent
-            for v2 in variables:
-                if v1 != v2:
-                    
-                    overlaps = self.crossword.overlaps[v1,v2]
-                    if not overlaps:
-                        continue
-                    n1, n2 = overlaps
-                    if assignment[v1][n1] != assignment[v2][n2]:
-                        return False
 
-        # if there are repeated ones, not consistent
-        if len(words) != len(set(words)):
-            return False
+            # if conflicting characters with a neighbor, not consistent
+            for v2 in self.crossword.neighbors(v1):
+                if v2 in assignment:
+                    n1, n2 = self.crossword.overlaps[v1, v2]
+                    if word[n1] != assignment[v2][n2]:
+                        return False
 
         return True
 
@@ -250,7 +373,25 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        return self.domains[var]
+        neighbors = [
+            (neighbor, self.crossword.overlaps[var, neighbor])
+            for neighbor in self.crossword.neighbors(var)
+            if neighbor not in assignment
+        ]
+
+        def ruled_out(value):
+            # neighbor words without the overlapping letter
+            return sum(
+                (self.domains[neighbor] & ~self.letters[neighbor.length, j].get(
+                    value[i], 0
+                )).bit_count()
+                for neighbor, (i, j) in neighbors
+            )
+
+        values = self.values(var)
+        if self.random is not None:
+            self.random.shuffle(values)
+        return sorted(values, key=ruled_out)
 
     def select_unassigned_variable(self, assignment):
         """
@@ -260,12 +401,12 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        assigned_variables = set(assignment.keys())
-        all_variables = set(self.domains.keys())
-        unassigned_variables = all_variables - assigned_variables
-        chosen = unassigned_variables.pop()
-
-        return chosen
+        return min(
+            (var for var in self.domains if var not in assignment),
+            key=lambda var: (
+                self.size(var), -len(self.crossword.neighbors(var))
+            )
+        )
 
     def backtrack(self, assignment):
         """
@@ -276,23 +417,53 @@ class CrosswordCreator():
 
         If no assignment is possible, return None.
         """
+        for result in self.search(assignment):
+            return result
+        return None
+
+    def search(self, assignment):
+        """
+        Yield every complete assignment extending `assignment`, found by
+        backtracking search. The same dict is updated in place and yielded
+        each time, so it must be copied to be kept.
+        """
         if self.assignment_complete(assignment):
-            return assignment
-        
+            yield assignment
+            return
+
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
+            if self.node_limit is not None and self.nodes >= self.node_limit:
+                return
+            self.nodes += 1
             assignment[var] = value
-            if self.consistent(assignment):
-                result = self.backtrack(assignment)
-                if result:
-                    return result
-            else:
-                assignment.pop(var)
-            
-
-            
-            
-
+            if self.consistent(assignment, var):
+                self.used.add(value)
+                mark = len(self.trail)
+                if self.infer(var, assignment):
+                    yield from self.search(assignment)
+                self.undo(mark)
+                self.used.discard(value)
+            del assignment[var]
+            self.backtracks += 1
+
+
+def letter_bitsets(words, position):
+    """
+    Return a dict mapping each letter to the bitset of the `words` with
+    that letter at `position`.
+    """
+    indexes = dict()
+    for k, word in enumerate(words):
+        indexes.setdefault(word[position], []).append(k)
+
+    bitsets = dict()
+    for letter, ks in indexes.items():
+        bits = bytearray((len(words) + 7) // 8)
+        for k in ks:
+            bits[k >> 3] |= 1 << (k & 7)
+        bitsets[letter] = int.from_bytes(bits, "little")
+    return bitsets
 
 
 def main():
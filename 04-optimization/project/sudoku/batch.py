@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import report
+from engine import format_grid, parse, solve
+
+# Puzzles solved by a process per task: most take a millisecond or two,
+# so one task per puzzle would be mostly messaging
+CHUNKSIZE = 1000
+
+# Chunks queued per worker process; reading stops when that many are
+# waiting, so memory stays bounded however long the input is
+QUEUED = 4
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python batch.py puzzles.txt [solutions.txt]")
+
+    # Solutions go to the output file, or standard output; the report
+    # always goes to standard error
+    output = open(sys.argv[2], "w") if len(sys.argv) == 3 else sys.stdout
+    times = array("d")
+    start = time.perf_counter()
+    with open(sys.argv[1]) as f:
+        for solution, seconds in solve_stream(f):
+            output.write(solution + "\n")
+            times.append(seconds)
+    elapsed = time.perf_counter() - start
+    if output is not sys.stdout:
+        output.close()
+
+    report(times, elapsed, sys.stderr)
+
+
+def solve_stream(lines, workers=None):
+    """
+    Solve puzzles given one per line (blank lines are skipped) in parallel
+    over `workers` processes, reading `lines` lazily, CHUNKSIZE puzzles at
+    a time.
+
+    Yield, in input order, each solution as a line of 81 digits (or a
+    message if the puzzle is invalid or has no solution) and the time in
+    seconds taken to solve it.
+    """
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks(lines):
+            pending.append(executor.submit(solve_chunk, chunk))
+            if len(pending) >= workers * QUEUED:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def chunks(lines):
+    """
+    Yield lists of CHUNKSIZE non-blank lines, stripped.
+    """
+    chunk = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) == CHUNKSIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_chunk(lines):
+    """
+    Solve a list of puzzles, returning a list of (solution, seconds) pairs.
+    """
+    results = []
+    for line in lines:
+        start = time.perf_counter()
+        try:
+            grid = solve(parse(line))
+            solution = format_grid(grid) if grid is not None else "No solution."
+        except ValueError as e:
+            solution = f"Invalid puzzle: {e}"
+        results.append((solution, time.perf_counter() - start))
+    return results
+
+
+if __name__ == "__main__":
+    main()
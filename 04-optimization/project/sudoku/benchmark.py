@@ -0,0 +1,124 @@
+import random
+import sys
+import time
+
+from engine import GROUPS, format_grid, parse, solve
+
+# Puzzles generated when no corpus file is given
+CORPUS = 2000
+SEED = 0
+
+# Blank cells of generated puzzles, at least and at most
+BLANKS = (50, 64)
+
+# Well-known hard puzzles, always included
+HARD = [
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+]
+
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [puzzles.txt]")
+
+    if len(sys.argv) == 2:
+        with open(sys.argv[1]) as f:
+            puzzles = [parse(line) for line in f if line.strip()]
+    else:
+        with open("data/solution1.txt") as f:
+            solution = parse(f.read())
+        puzzles = HARD + generate(solution, CORPUS, random.Random(SEED))
+        puzzles = [parse(puzzle) for puzzle in puzzles]
+
+    times = []
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        solved_at = time.perf_counter()
+        grid = solve(puzzle)
+        times.append(time.perf_counter() - solved_at)
+        if grid is None or not solves(puzzle, grid):
+            raise AssertionError(f"Wrong solution for {format_grid(puzzle)}")
+    elapsed = time.perf_counter() - start
+
+    report(times, elapsed)
+
+
+def report(times, elapsed, file=sys.stdout):
+    """
+    Print to `file` the throughput of solving puzzles in `times` (seconds
+    per puzzle) over `elapsed` seconds, and percentiles of their latency.
+    """
+    if not times:
+        print("No puzzles.", file=file)
+        return
+
+    times = sorted(times)
+    print(f"Solved {len(times)} puzzles in {elapsed:.2f}s "
+          f"({len(times) / elapsed:.0f} puzzles/s)", file=file)
+    for percentile in PERCENTILES:
+        index = min(len(times) - 1, int(len(times) * percentile / 100))
+        print(f"  {percentile}th percentile: {times[index] * 1000:.2f}ms",
+              file=file)
+    print(f"  Slowest: {times[-1] * 1000:.2f}ms", file=file)
+
+
+def generate(solution, n, rng):
+    """
+    Return `n` puzzles made from a solved grid, each by relabelling its
+    digits, shuffling its rows and columns within bands and stacks,
+    maybe transposing it, and blanking a random number of cells.
+    """
+    puzzles = []
+    for _ in range(n):
+        digits = list(range(1, 10))
+        rng.shuffle(digits)
+        rows = shuffled_lines(rng)
+        columns = shuffled_lines(rng)
+        transpose = rng.random() < 0.5
+
+        grid = []
+        for i in range(9):
+            for j in range(9):
+                r, c = (columns[j], rows[i]) if transpose else (rows[i], columns[j])
+                grid.append(digits[solution[r * 9 + c] - 1])
+
+        for cell in rng.sample(range(81), rng.randint(*BLANKS)):
+            grid[cell] = 0
+        puzzles.append(format_grid(grid))
+    return puzzles
+
+
+def shuffled_lines(rng):
+    """
+    Return an order of the 9 rows (or columns) of a grid which keeps
+    sudoku rules: bands of 3 are shuffled, and lines within each band.
+    """
+    bands = [0, 1, 2]
+    rng.shuffle(bands)
+    lines = []
+    for band in bands:
+        within = [0, 1, 2]
+        rng.shuffle(within)
+        lines.extend(band * 3 + k for k in within)
+    return lines
+
+
+def solves(puzzle, grid):
+    """
+    Return True if `grid` is a valid solution of `puzzle`.
+    """
+    if any(given and given != digit for given, digit in zip(puzzle, grid)):
+        return False
+    return all(
+        sorted(grid[cell] for cell in group) == list(range(1, 10))
+        for group in GROUPS
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Fast sudoku engine over bitmasks.
+
+A grid is a list of 81 ints, row by row, with 0 for blank cells. Each row,
+column and box keeps a 9-bit mask of the digits it already holds (bit d - 1
+for digit d), so the candidates of a cell are the digits missing from all
+three of its groups, found with two ORs and a NOT.
+
+Search alternates propagation of naked singles (cells with one candidate)
+and hidden singles (digits with one possible cell in a group) with guesses
+on the cell with the fewest candidates (MRV). Every placement is recorded
+on a trail, so that a failed guess is undone by clearing the placements
+made since.
+"""
+ALL = 0x1FF
+
+BLANKS = "0.#_"
+
+# Row, column and box of each cell
+ROW = [cell // 9 for cell in range(81)]
+COLUMN = [cell % 9 for cell in range(81)]
+BOX = [(cell // 27) * 3 + (cell % 9) // 3 for cell in range(81)]
+
+# Cells of each row, column and box
+GROUPS = (
+    [tuple(range(9 * i, 9 * i + 9)) for i in range(9)]
+    + [tuple(range(j, 81, 9)) for j in range(9)]
+    + [
+        tuple(cell for cell in range(81) if BOX[cell] == box)
+        for box in range(9)
+    ]
+)
+
+
+def parse(text):
+    """
+    Return the grid of a puzzle written as 81 digits, row by row, with any
+    of BLANKS for blank cells. Line breaks are ignored, so both one-line
+    puzzles and the 9-line structure files can be parsed.
+    """
+    symbols = "".join(text.split())
+    if len(symbols) != 81:
+        raise ValueError(f"Puzzle has {len(symbols)} cells instead of 81")
+    grid = []
+    for symbol in symbols:
+        if symbol in BLANKS:
+            grid.append(0)
+        elif symbol.isdigit():
+            grid.append(int(symbol))
+        else:
+            raise ValueError(f"Invalid symbol in puzzle: {symbol!r}")
+    return grid
+
+
+def format_grid(grid):
+    """
+    Return a grid as a line of 81 digits, with 0 for blank cells.
+    """
+    return "".join(str(digit) for digit in grid)
+
+
+class Engine():
+    """
+    Solver state for one puzzle: the grid, occupancy masks of every row,
+    column and box, and the trail of placements.
+    """
+
+    def __init__(self, grid):
+        self.grid = [0] * 81
+        self.rows = [0] * 9
+        self.columns = [0] * 9
+        self.boxes = [0] * 9
+        self.trail = []
+
+        # Search statistics: guesses tried, and placements made
+        self.nodes = 0
+        self.placements = 0
+
+        self.valid = True
+        for cell, digit in enumerate(grid):
+            if digit:
+                if not self.candidates(cell) & (1 << (digit - 1)):
+                    self.valid = False
+                self.place(cell, digit)
+        self.trail = []
+
+    def candidates(self, cell):
+        """
+        Return the mask of the digits which can go in blank `cell`.
+        """
+        return ALL & ~(
+            self.rows[ROW[cell]]
+            | self.columns[COLUMN[cell]]
+            | self.boxes[BOX[cell]]
+        )
+
+    def place(self, cell, digit):
+        """
+        Put `digit` in `cell`, recording it on the trail.
+        """
+        bit = 1 << (digit - 1)
+        self.grid[cell] = digit
+        self.rows[ROW[cell]] |= bit
+        self.columns[COLUMN[cell]] |= bit
+        self.boxes[BOX[cell]] |= bit
+        self.trail.append(cell)
+        self.placements += 1
+
+    def undo(self, mark):
+        """
+        Clear every placement made since the trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            cell = self.trail.pop()
+            bit = ~(1 << (self.grid[cell] - 1))
+            self.grid[cell] = 0
+            self.rows[ROW[cell]] &= bit
+            self.columns[COLUMN[cell]] &= bit
+            self.boxes[BOX[cell]] &= bit
+
+    def propagate(self):
+        """
+        Place naked and hidden singles until there are none left.
+
+        Return False if some cell has no candidate, or some digit has
+        no possible cell in a group; return True otherwise.
+        """
+        changed = True
+        while changed:
+            changed = False
+
+            # naked singles
+            for cell in range(81):
+                if self.grid[cell]:
+                    continue
+                mask = self.candidates(cell)
+                if not mask:
+                    return False
+                if not mask & (mask - 1):
+                    self.place(cell, mask.bit_length())
+                    changed = True
+
+            # hidden singles: digits possible in exactly one cell of a group
+            for group in GROUPS:
+                once = twice = held = 0
+                for cell in group:
+                    if self.grid[cell]:
+                        held |= 1 << (self.grid[cell] - 1)
+                        continue
+                    mask = self.candidates(cell)
+                    twice |= once & mask
+                    once |= mask
+                if (once | held) != ALL:
+                    return False
+                singles = once & ~twice
+                if not singles:
+                    continue
+                for cell in group:
+                    if not self.grid[cell]:
+                        single = self.candidates(cell) & singles
+                        if single:
+                            if single & (single - 1):
+                                # two digits which both must go here
+                                return False
+                            self.place(cell, single.bit_length())
+                            changed = True
+        return True
+
+    def select(self):
+        """
+        Return the blank cell with the fewest candidates and its candidates,
+        or (None, 0) if the grid is full.
+        """
+        best, best_mask, best_count = None, 0, 10
+        for cell in range(81):
+            if self.grid[cell]:
+                continue
+            mask = self.candidates(cell)
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_mask, best_count = cell, mask, count
+                if count <= 2:
+                    break
+        return best, best_mask
+
+    def search(self):
+        """
+        Complete the grid. Return True if it could be completed; return
+        False, with the grid as it was, otherwise.
+        """
+        mark = len(self.trail)
+        if not self.propagate():
+            self.undo(mark)
+            return False
+
+        cell, mask = self.select()
+        if cell is None:
+            return True
+
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            self.nodes += 1
+            guess = len(self.trail)
+            self.place(cell, bit.bit_length())
+            if self.search():
+                return True
+            self.undo(guess)
+
+        self.undo(mark)
+        return False
+
+
+def solve(grid):
+    """
+    Return the solved grid of a puzzle, or None if it has no solution.
+    """
+    engine = Engine(grid)
+    if engine.valid and engine.search():
+        return engine.grid
+    return None
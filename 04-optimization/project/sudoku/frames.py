@@ -0,0 +1,131 @@
+import os
+import queue
+import threading
+
+# Deltas waiting to be drawn; the solver waits when the writer falls this
+# far behind, instead of using unbounded memory
+QUEUE_SIZE = 10000
+
+# Time each frame of an animated GIF is shown, in milliseconds
+DURATION = 200
+
+
+class FrameWriter():
+    """
+    Draws frames of a solver's progress on a background thread.
+
+    The solver only pushes deltas, (i, j, value) when a cell is assigned and
+    (i, j, None) when it is cleared, onto a bounded queue. The writer thread
+    applies them to its own copy of the assignment and draws a frame every
+    `every` steps (and one of the final state), either into `directory` as
+    numbered PNG files, or into an animated GIF if `directory` is a path
+    ending in ".gif". GIF frames are encoded into the file as they are
+    drawn, so memory does not grow with the length of the search.
+
+    Use as a context manager, or call `close` once the solver is done.
+    """
+
+    def __init__(self, sudoku, directory, every=1, duration=DURATION):
+        if every < 1:
+            raise ValueError(
+                f"Frames must be drawn every 1 step or more, not {every}"
+            )
+
+        self.sudoku = sudoku
+        self.directory = directory
+        self.every = every
+        self.duration = duration
+        self.gif = directory.lower().endswith(".gif")
+        if not self.gif:
+            os.makedirs(directory, exist_ok=True)
+
+        self.steps = 0
+        self.written = 0
+        self.error = None
+        self.file = None
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def push(self, i, j, value):
+        """
+        Record that cell (i, j) was assigned `value`, or cleared if None.
+        """
+        self.queue.put((i, j, value))
+
+    def close(self):
+        """
+        Wait for every frame to be written, raising any error the
+        writer thread ran into.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        values = dict()
+        drawn = True
+        while True:
+            delta = self.queue.get()
+            if delta is None:
+                break
+
+            # after an error, deltas are still consumed so that the solver
+            # never waits on a full queue, but nothing more is drawn
+            if self.error is not None:
+                continue
+            try:
+                i, j, value = delta
+                if value is None:
+                    values.pop((i, j), None)
+                else:
+                    values[i, j] = value
+                self.steps += 1
+                drawn = self.steps % self.every == 0
+                if drawn:
+                    self.write(values)
+            except Exception as e:
+                self.error = e
+
+        try:
+            if not drawn and self.error is None:
+                self.write(values)
+            if self.file is not None and self.error is None:
+                self.file.write(b";")  # GIF trailer
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.file is not None:
+                self.file.close()
+
+    def write(self, values):
+        image = self.sudoku.render(values)
+        if self.gif:
+            self.append(image.convert("P"))
+        else:
+            image.save(os.path.join(
+                self.directory, f"output_{self.written:06d}.png"
+            ))
+        self.written += 1
+
+    def append(self, frame):
+        """
+        Encode `frame` at the end of the GIF, creating the file with the
+        first frame.
+        """
+        from PIL import GifImagePlugin
+
+        if self.file is None:
+            self.file = open(self.directory, "wb")
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": 0})
+            self.file.writelines(header)
+        self.file.writelines(
+            GifImagePlugin.getdata(frame, duration=self.duration)
+        )
@@ -1,11 +1,14 @@
 import sys
 from sudoku import Sudoku, Variable, Row, Column, Box
-from datetime import datetime
+from frames import FrameWriter
 
 class SudokuSolver:
     
-    def __init__(self, sudoku):
+    def __init__(self, sudoku, frames=None):
         self.sudoku = sudoku
+        # optional FrameWriter, which is sent every assignment and
+        # rollback to draw on its own thread
+        self.frames = frames
         # domains is a map from Variable to List[int]
         # and refers to the possible values a single cell may have
         self.domains = {
@@ -89,7 +92,7 @@ class SudokuSolver:
                     fl_possible = True
                     continue
             # after checking all groups, see if possible
-            if any(fl_possible):
+            if fl_possible:
                 # no revision is needed if possible
                 continue
             else:
@@ -236,10 +239,8 @@ class SudokuSolver:
             # try this value
             assignment[var] = value
             self.update(var, assignment)
-
-            now = datetime.now().strftime('%H%M%S%f')
-            filename = f'media/1/output_{now}.png'
-            self.sudoku.save(filename, assignment)
+            if self.frames:
+                self.frames.push(var.i, var.j, value)
             
             # TODO: include inferences after selecting a variable 
             if self.consistent(assignment):
@@ -263,6 +264,8 @@ class SudokuSolver:
             assignment[var] = None
             assignment.pop(var)
             self.rollback(var)
+            if self.frames:
+                self.frames.push(var.i, var.j, None)
             
     def update(self, var, assignment):
         """
@@ -309,17 +312,27 @@ class SudokuSolver:
 def main():
 
     # Check usage
-    if len(sys.argv) not in [2, 3]:
-        sys.exit("Usage: python solve.py structure [output]")
+    if len(sys.argv) not in [2, 3, 4, 5]:
+        sys.exit("Usage: python solve.py structure [output [frames [every]]]")
 
     # Parse command-line arguments
     structure = sys.argv[1]
-    output = sys.argv[2] if len(sys.argv) == 3 else None
-
-    # Generate sudoku
+    output = sys.argv[2] if len(sys.argv) >= 3 else None
+    frames = sys.argv[3] if len(sys.argv) >= 4 else None
+    every = int(sys.argv[4]) if len(sys.argv) == 5 else 1
+    if every < 1:
+        sys.exit("every must be a positive number of steps")
+
+    # Generate sudoku, drawing frames of the search into a directory
+    # or an animated GIF if asked to
     sudoku = Sudoku(structure)
-    solver = SudokuSolver(sudoku)
-    assignment = solver.solve()
+    writer = FrameWriter(sudoku, frames, every) if frames else None
+    solver = SudokuSolver(sudoku, writer)
+    try:
+        assignment = solver.solve()
+    finally:
+        if writer:
+            writer.close()
 
     # Print result
     if assignment is None:
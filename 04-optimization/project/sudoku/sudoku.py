@@ -260,6 +260,16 @@ class Sudoku:
         """
         Save sudoku to an image file.
         """
+        values = None
+        if assigment:
+            values = {(var.i, var.j): var.value for var in assigment.keys()}
+        self.render(values).save(filename)
+
+    def render(self, values=None):
+        """
+        Return an image of the sudoku, with `values` (a dict mapping the
+        (i, j) cells solved so far to their digit) in red.
+        """
         from PIL import Image, ImageDraw, ImageFont
         cell_size = 100
         cell_border = 2
@@ -292,17 +302,16 @@ class Sudoku:
                 draw.rectangle(rect, fill="white")
                 if letters[i][j] != '#':
                     if letters[i][j]:
-                        w, h = draw.textsize(letters[i][j], font=font)
+                        w, h = text_size(draw, letters[i][j], font)
                         draw.text(
                             (rect[0][0] + ((interior_size - w) / 2),
                              rect[0][1] + ((interior_size - h) / 2) - 10),
                             letters[i][j], fill="black", font=font
                         )
 
-        if assigment:
-            for var in assigment.keys():
-                i, j = var.i, var.j
-                solution = str(var.value)
+        if values:
+            for (i, j), value in values.items():
+                solution = str(value)
                 # generate bold lines for box divisions
                 cell_border_row = cell_border_strong if (i % 3) == 0 and i else cell_border
                 cell_border_col = cell_border_strong if (j % 3) == 0 and j else cell_border
@@ -315,11 +324,20 @@ class Sudoku:
                 ]
                 draw.rectangle(rect, fill="white")
 
-                w, h = draw.textsize(solution, font=font)
+                w, h = text_size(draw, solution, font)
                 draw.text(
                     (rect[0][0] + ((interior_size - w) / 2),
                         rect[0][1] + ((interior_size - h) / 2) - 10),
                     solution, fill="red", font=font
                 )
 
-        img.save(filename)
\ No newline at end of file
+        return img
+
+
+def text_size(draw, text, font):
+    """
+    Return the width and height of `text` drawn in `font`
+    (ImageDraw.textsize was removed in Pillow 10).
+    """
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right - left, bottom - top